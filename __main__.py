@@ -0,0 +1,3 @@
+from defi_risk_agent.cli import main
+
+main()
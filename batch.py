@@ -0,0 +1,245 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from defi_risk_agent.simulator import (
+    compute_liquidation_drop,
+    compute_liquidation_price,
+    compute_ltv,
+    compute_max_borrow,
+    is_multi_asset,
+)
+
+# =========================================================
+# Struct-of-arrays position book
+# =========================================================
+
+PRICE_DROPS = [0.10, 0.20, 0.30, 0.40]
+BORROW_SENSITIVITY_MULTIPLIERS = [0.7, 0.8, 1.0, 1.1]
+
+
+@dataclass(frozen=True)
+class PositionBatch:
+    """
+    Column-oriented book of single-collateral positions.
+    Row i of every column describes the same position.
+    """
+
+    collateral_amount: np.ndarray
+    borrowed_amount: np.ndarray
+    price: np.ndarray
+    liquidation_threshold: np.ndarray
+    protocol: Optional[np.ndarray] = None
+
+    def __post_init__(self):
+        columns = {
+            "collateral_amount": self.collateral_amount,
+            "borrowed_amount": self.borrowed_amount,
+            "price": self.price,
+            "liquidation_threshold": self.liquidation_threshold,
+        }
+
+        n = None
+        for name, values in columns.items():
+            values = np.asarray(values, dtype=float)
+            if values.ndim != 1:
+                raise ValueError(f"{name} must be one-dimensional")
+            if n is None:
+                n = len(values)
+            elif len(values) != n:
+                raise ValueError(f"{name} has {len(values)} rows, expected {n}")
+            object.__setattr__(self, name, values)
+
+        if self.protocol is not None:
+            protocol = np.asarray(self.protocol)
+            if protocol.shape != (n,):
+                raise ValueError(f"protocol has shape {protocol.shape}, expected ({n},)")
+            object.__setattr__(self, "protocol", protocol)
+
+    def __len__(self) -> int:
+        return len(self.collateral_amount)
+
+    @classmethod
+    def from_strategies(cls, strategies) -> "PositionBatch":
+        """
+        Build a batch from strategy documents (same schema as strategy.yaml).
+        Collateral baskets have no single price; stack them with
+        stress.scenario_matrix.basket_columns instead.
+        """
+        strategies = list(strategies)
+        if any(is_multi_asset(s) for s in strategies):
+            raise ValueError(
+                "PositionBatch holds single-collateral positions only; "
+                "use basket_columns() for multi-asset collateral"
+            )
+
+        return cls(
+            collateral_amount=np.fromiter(
+                (s["position"]["collateral_amount"] for s in strategies),
+                dtype=float, count=len(strategies),
+            ),
+            borrowed_amount=np.fromiter(
+                (s["position"]["borrowed_amount"] for s in strategies),
+                dtype=float, count=len(strategies),
+            ),
+            price=np.fromiter(
+                (s["market"]["collateral_price"] for s in strategies),
+                dtype=float, count=len(strategies),
+            ),
+            liquidation_threshold=np.fromiter(
+                (s["protocol"]["liquidation_threshold"] for s in strategies),
+                dtype=float, count=len(strategies),
+            ),
+            protocol=np.array([s["protocol"]["name"] for s in strategies]),
+        )
+
+    def collateral_value(self) -> np.ndarray:
+        return self.collateral_amount * self.price
+
+    def ltv(self) -> np.ndarray:
+        return compute_ltv(self.borrowed_amount, self.collateral_value())
+
+
+# =========================================================
+# Batched kernels (one row per position)
+# =========================================================
+
+def generate_base_report_batch(batch: PositionBatch) -> Dict:
+    """
+    Batched generate_base_report: columns instead of one dict per position.
+    """
+    liquidation = solve_liquidation_batch(batch)
+
+    return {
+        "protocol": batch.protocol,
+        "current_ltv_pct": np.round(batch.ltv() * 100, 2),
+        "liquidation_threshold_pct": np.round(batch.liquidation_threshold * 100, 2),
+        "liquidation_price": np.round(liquidation["critical_price"], 2),
+        "liquidation_drop_pct": np.round(
+            np.maximum(liquidation["critical_drop"], 0) * 100, 2
+        ),
+    }
+
+
+def solve_liquidation_batch(batch: PositionBatch) -> Dict:
+    """
+    Exact first-liquidation point of every position.
+    A position is liquidated strictly below critical_price, i.e. for
+    drops strictly larger than critical_drop (negative if already
+    liquidated), or when borrowing strictly more than critical_borrow.
+    """
+    critical_price = compute_liquidation_price(
+        batch.collateral_amount, batch.borrowed_amount, batch.liquidation_threshold
+    )
+
+    return {
+        "critical_price": critical_price,
+        "critical_drop": compute_liquidation_drop(batch.price, critical_price),
+        "critical_borrow": compute_max_borrow(
+            batch.collateral_amount, batch.price, batch.liquidation_threshold
+        ),
+    }
+
+
+def simulate_price_drop_batch(batch: PositionBatch, drops=PRICE_DROPS) -> Dict:
+    """
+    Batched simulate_price_drop over every position and every drop.
+    Result arrays have shape (len(batch), len(drops)).
+    """
+    drops = np.asarray(drops, dtype=float)
+
+    new_price = batch.price[:, None] * (1 - drops[None, :])
+    new_collateral_value = batch.collateral_amount[:, None] * new_price
+    ltv = compute_ltv(batch.borrowed_amount[:, None], new_collateral_value)
+
+    return {
+        "price_drop_pct": np.round(drops * 100, 2),
+        "new_price": np.round(new_price, 2),
+        "ltv_pct": np.round(ltv * 100, 2),
+        "liquidated": ltv > batch.liquidation_threshold[:, None],
+    }
+
+
+def analyze_borrow_sensitivity_batch(
+    batch: PositionBatch,
+    multipliers=BORROW_SENSITIVITY_MULTIPLIERS,
+) -> Dict:
+    """
+    Batched analyze_borrow_sensitivity.
+    Result arrays have shape (len(batch), len(multipliers)).
+    """
+    multipliers = np.asarray(multipliers, dtype=float)
+
+    borrowed = batch.borrowed_amount[:, None] * multipliers[None, :]
+    ltv = compute_ltv(borrowed, batch.collateral_value()[:, None])
+    buffer = batch.liquidation_threshold[:, None] - ltv
+
+    return {
+        "parameter": "borrowed_amount",
+        "borrowed_amount": np.round(borrowed, 2),
+        "ltv_pct": np.round(ltv * 100, 2),
+        "liquidation_buffer_pct": np.round(buffer * 100, 2),
+    }
+
+
+# Same bands as generate_risk_report
+RISK_LEVELS = np.array(["HIGH", "MEDIUM", "LOW"])
+RISK_LEVEL_DROPS = [0.20, 0.40]
+
+
+def generate_risk_report_batch(batch: PositionBatch, drops=PRICE_DROPS) -> Dict:
+    """
+    Batched generate_risk_report. Scalar fields become columns and
+    stress_test_results holds the simulate_price_drop_batch arrays.
+    Like the other batch kernels this rounds with np.round, which can
+    differ from round() by 0.01 on exact halfway values.
+    """
+    liquidation = solve_liquidation_batch(batch)
+    liquidation_drop = np.maximum(liquidation["critical_drop"], 0)
+
+    return {
+        "protocol": batch.protocol,
+        "current_ltv_pct": np.round(batch.ltv() * 100, 2),
+        "liquidation_threshold_pct": batch.liquidation_threshold * 100,
+        "liquidation_price": np.round(liquidation["critical_price"], 2),
+        "liquidation_price_drop_pct": np.round(liquidation_drop * 100, 2),
+        "risk_level": RISK_LEVELS[
+            np.searchsorted(RISK_LEVEL_DROPS, liquidation_drop, side="right")
+        ],
+        "stress_test_results": simulate_price_drop_batch(batch, drops),
+    }
+
+
+def risk_report_rows(report: Dict) -> list:
+    """
+    Split generate_risk_report_batch columns into one
+    generate_risk_report-shaped dict per position.
+    """
+    stress = report["stress_test_results"]
+    drop_pct = stress["price_drop_pct"].tolist()
+    columns = {
+        name: np.asarray(values).tolist()
+        for name, values in report.items()
+        if name != "stress_test_results"
+    }
+    stress_columns = {
+        name: stress[name].tolist()
+        for name in ("new_price", "ltv_pct", "liquidated")
+    }
+
+    rows = []
+    for i in range(len(columns["current_ltv_pct"])):
+        row = {name: values[i] for name, values in columns.items()}
+        row["stress_test_results"] = [
+            {
+                "price_drop_pct": drop,
+                "new_price": stress_columns["new_price"][i][j],
+                "ltv_pct": stress_columns["ltv_pct"][i][j],
+                "liquidated": stress_columns["liquidated"][i][j],
+            }
+            for j, drop in enumerate(drop_pct)
+        ]
+        rows.append(row)
+
+    return rows
@@ -0,0 +1,257 @@
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from defi_risk_agent.phase2.governance_stress import run_governance_stress_book
+from defi_risk_agent.phase2.multi_protocol_runner import run_multi_protocol_book
+from defi_risk_agent.phase2.strategy_comparison import run_strategy_comparison_book
+from defi_risk_agent.reports.columnar import write_columnar_report
+from defi_risk_agent.reports.generate_report import build_report
+from defi_risk_agent.scoring.risk_surface import (
+    aggregate_risk_surface,
+    aggregate_risk_surface_stream,
+)
+from defi_risk_agent.simulator import generate_risk_report, load_strategy
+from defi_risk_agent.stress.scenario_matrix import (
+    iter_scenario_grid,
+    run_scenario_grid,
+    run_scenario_matrix,
+)
+
+
+# =========================================================
+# Workload sizes
+# =========================================================
+
+# (price shocks, borrow multipliers, volatility regimes)
+GRID_SIZES = [
+    (5, 3, 4),
+    (50, 30, 4),
+    (500, 100, 8),
+    (2000, 200, 24),
+]
+
+# Larger grids are benchmarked through the columnar engine only;
+# materializing one dict per row would dominate time and memory
+MAX_ROW_CELLS = 500_000
+
+POSITION_COUNTS = [1, 100, 1000, 10000]
+
+QUICK_GRID_SIZES = GRID_SIZES[:2]
+QUICK_POSITION_COUNTS = POSITION_COUNTS[:2]
+
+
+def make_grid(shocks: int, borrows: int, regimes: int):
+    return (
+        np.linspace(0.01, 0.9, shocks).tolist(),
+        np.linspace(0.5, 1.5, borrows).tolist(),
+        {f"regime_{i}": 0.5 + i * 1.5 / max(regimes - 1, 1) for i in range(regimes)},
+    )
+
+
+def make_book(base, count: int, seed: int = 0):
+    """
+    Deterministic book of positions around the base strategy.
+    """
+    rng = np.random.default_rng(seed)
+    scales = rng.uniform(0.5, 1.5, count)
+
+    return [
+        base.override(
+            "position", borrowed_amount=base.borrowed_amount * float(scale)
+        )
+        for scale in scales
+    ]
+
+
+# =========================================================
+# Measurement
+# =========================================================
+
+def measure(name: str, size: dict, fn, scenarios: int, repeat: int) -> dict:
+    """
+    Best-of-repeat wall time, plus peak traced memory from a separate run
+    (tracing slows execution, so it is not timed).
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = min(timings)
+
+    return {
+        "name": name,
+        "size": size,
+        "scenarios": scenarios,
+        "seconds": seconds,
+        "scenarios_per_sec": scenarios / seconds if seconds > 0 else None,
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_report_pipeline(strategy):
+    with tempfile.TemporaryDirectory() as directory:
+        write_columnar_report(build_report(strategy), directory)
+
+
+def run_benchmarks(quick: bool = False, repeat: int = 3) -> list:
+    base = load_strategy("strategy.yaml")
+    threshold = base.liquidation_threshold
+
+    grid_sizes = QUICK_GRID_SIZES if quick else GRID_SIZES
+    position_counts = QUICK_POSITION_COUNTS if quick else POSITION_COUNTS
+
+    results = []
+
+    for shocks, borrows, regimes in grid_sizes:
+        grid = make_grid(shocks, borrows, regimes)
+        size = {"price_shocks": shocks, "borrow_multipliers": borrows, "regimes": regimes}
+        cells = shocks * borrows * regimes
+
+        results.append(measure(
+            "run_scenario_grid", size,
+            lambda: run_scenario_grid(base, *grid),
+            cells, repeat,
+        ))
+        results.append(measure(
+            "aggregate_risk_surface_stream", size,
+            lambda: aggregate_risk_surface_stream(iter_scenario_grid(base, *grid), threshold),
+            cells, repeat,
+        ))
+
+        if cells > MAX_ROW_CELLS:
+            continue
+
+        results.append(measure(
+            "run_scenario_matrix", size,
+            lambda: run_scenario_matrix(base, *grid),
+            cells, repeat,
+        ))
+
+        matrix = run_scenario_matrix(base, *grid)
+        results.append(measure(
+            "aggregate_risk_surface", size,
+            lambda: aggregate_risk_surface(matrix, threshold),
+            cells, repeat,
+        ))
+        del matrix
+
+    # Default 5 x 3 x 4 grid per variant
+    cells = 60
+
+    for count in position_counts:
+        book = make_book(base, count)
+        size = {"positions": count}
+
+        results.append(measure(
+            "run_governance_stress", size,
+            lambda: run_governance_stress_book(book),
+            count * 4 * cells, repeat,
+        ))
+        results.append(measure(
+            "run_multi_protocol_analysis", size,
+            lambda: run_multi_protocol_book(book),
+            count * 3 * cells, repeat,
+        ))
+        results.append(measure(
+            "run_strategy_comparison", size,
+            lambda: run_strategy_comparison_book(book, threshold),
+            count * 3 * cells, repeat,
+        ))
+        results.append(measure(
+            "generate_risk_report", size,
+            lambda: [generate_risk_report(s) for s in book],
+            count * 4, repeat,
+        ))
+
+    results.append(measure(
+        "report_pipeline", {"positions": 1},
+        lambda: run_report_pipeline(base),
+        cells, repeat,
+    ))
+
+    return results
+
+
+# =========================================================
+# Regression check
+# =========================================================
+
+def compare(results: list, baseline: list, tolerance: float) -> list:
+    """
+    Entries whose time grew by more than tolerance (0.2 = 20%)
+    relative to the same (name, size) in baseline.
+    """
+    previous = {
+        (r["name"], json.dumps(r["size"], sort_keys=True)): r for r in baseline
+    }
+
+    regressions = []
+    for r in results:
+        old = previous.get((r["name"], json.dumps(r["size"], sort_keys=True)))
+        if old and r["seconds"] > old["seconds"] * (1 + tolerance):
+            regressions.append({
+                "name": r["name"],
+                "size": r["size"],
+                "baseline_seconds": old["seconds"],
+                "seconds": r["seconds"],
+                "ratio": round(r["seconds"] / old["seconds"], 3),
+            })
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark stress and scoring entry points")
+    parser.add_argument("--quick", action="store_true", help="smallest sizes only")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write JSON results to this path")
+    parser.add_argument("--baseline", help="previous JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    output = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "results": run_benchmarks(args.quick, args.repeat),
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+    else:
+        json.dump(output, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare(output["results"], json.load(f)["results"], args.tolerance)
+
+        for r in regressions:
+            print(
+                f"REGRESSION {r['name']} {r['size']}: "
+                f"{r['baseline_seconds']:.4f}s -> {r['seconds']:.4f}s (x{r['ratio']})",
+                file=sys.stderr,
+            )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import csv
+import json
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+from defi_risk_agent.batch import PositionBatch
+
+# =========================================================
+# Columnar position book (directory of .npy columns)
+# =========================================================
+
+MANIFEST_NAME = "book.json"
+
+NUMERIC_COLUMNS = (
+    "collateral_amount",
+    "borrowed_amount",
+    "price",
+    "liquidation_threshold",
+)
+
+# Accepted CSV header aliases (strategy.yaml field names)
+CSV_ALIASES = {
+    "collateral_price": "price",
+}
+
+
+def write_position_book(batch: PositionBatch, directory):
+    """
+    Store a PositionBatch as one contiguous .npy file per column.
+    Protocol names are dictionary-encoded.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    columns = {name: getattr(batch, name) for name in NUMERIC_COLUMNS}
+    categories = None
+
+    if batch.protocol is not None:
+        categories, codes = np.unique(batch.protocol, return_inverse=True)
+        categories = categories.tolist()
+        columns["protocol"] = codes.astype(np.int32)
+
+    for name, values in columns.items():
+        np.save(directory / f"{name}.npy", np.ascontiguousarray(values))
+
+    _write_manifest(directory, len(batch), list(columns), categories)
+
+
+def convert_csv_to_book(csv_path, directory, chunk_rows: int = 1_000_000):
+    """
+    Convert a CSV book (header: collateral_amount, borrowed_amount,
+    price or collateral_price, liquidation_threshold, optional protocol)
+    in chunks of chunk_rows, writing straight into memory-mapped columns.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    # Count records, not lines: blank lines are skipped and quoted
+    # fields may span lines
+    with open(csv_path, "r", newline="") as f:
+        rows = max(sum(1 for row in csv.reader(f) if row) - 1, 0)
+
+    with open(csv_path, "r", newline="") as f:
+        reader = (row for row in csv.reader(f) if row)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError(f"CSV is empty: {csv_path}")
+        header = [CSV_ALIASES.get(h.strip(), h.strip()) for h in header]
+
+        missing = set(NUMERIC_COLUMNS) - set(header)
+        if missing:
+            raise ValueError(f"CSV is missing columns: {sorted(missing)}")
+
+        names = list(NUMERIC_COLUMNS)
+        has_protocol = "protocol" in header
+        if has_protocol:
+            names.append("protocol")
+
+        outputs = {
+            name: np.lib.format.open_memmap(
+                directory / f"{name}.npy",
+                mode="w+",
+                dtype=np.int32 if name == "protocol" else np.float64,
+                shape=(rows,),
+            )
+            for name in names
+        }
+        positions = [header.index(name) for name in NUMERIC_COLUMNS]
+        protocol_position = header.index("protocol") if has_protocol else None
+        categories = {}
+
+        start = 0
+        while start < rows:
+            chunk = list(islice(reader, chunk_rows))
+            if not chunk:
+                break
+            stop = start + len(chunk)
+
+            for name, position in zip(NUMERIC_COLUMNS, positions):
+                outputs[name][start:stop] = np.array(
+                    [row[position] for row in chunk], dtype=np.float64
+                )
+
+            if has_protocol:
+                outputs["protocol"][start:stop] = [
+                    categories.setdefault(row[protocol_position], len(categories))
+                    for row in chunk
+                ]
+
+            start = stop
+
+        for values in outputs.values():
+            values.flush()
+
+    _write_manifest(
+        directory,
+        start,
+        names,
+        sorted(categories, key=categories.get) if has_protocol else None,
+    )
+
+
+def _write_manifest(directory: Path, rows: int, columns: list, categories):
+    manifest = {"rows": rows, "columns": columns}
+    if categories is not None:
+        manifest["protocol_categories"] = categories
+
+    with open(directory / MANIFEST_NAME, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+# =========================================================
+# Loader
+# =========================================================
+
+def book_rows(directory) -> int:
+    with open(Path(directory) / MANIFEST_NAME, "r") as f:
+        return json.load(f)["rows"]
+
+
+def shard_ranges(rows: int, shards: int) -> list:
+    """
+    Contiguous (start, stop) row ranges, one per worker.
+    """
+    bounds = np.linspace(0, rows, shards + 1).astype(int).tolist()
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def load_position_book(
+    directory,
+    start: int = 0,
+    stop: int = None,
+    validate: bool = True,
+) -> PositionBatch:
+    """
+    Memory-map rows [start, stop) of a position book into a PositionBatch.
+    Numeric columns are zero-copy views of the files; only protocol
+    names (if present) are decoded into memory for the shard.
+    """
+    directory = Path(directory)
+    with open(directory / MANIFEST_NAME, "r") as f:
+        manifest = json.load(f)
+
+    rows = slice(start, manifest["rows"] if stop is None else stop)
+
+    columns = {
+        name: np.load(directory / f"{name}.npy", mmap_mode="r")[rows]
+        for name in NUMERIC_COLUMNS
+    }
+
+    protocol = None
+    if "protocol" in manifest["columns"]:
+        codes = np.load(directory / "protocol.npy", mmap_mode="r")[rows]
+        protocol = np.asarray(manifest["protocol_categories"])[codes]
+
+    if validate:
+        validate_columns(columns, offset=start)
+
+    return PositionBatch(protocol=protocol, **columns)
+
+
+def validate_columns(columns: dict, offset: int = 0):
+    """
+    Bulk validation; raises ValueError naming the first bad row.
+    """
+    checks = {
+        "collateral_amount": lambda v: np.isfinite(v) & (v > 0),
+        "borrowed_amount": lambda v: np.isfinite(v) & (v >= 0),
+        "price": lambda v: np.isfinite(v) & (v > 0),
+        "liquidation_threshold": lambda v: (v > 0) & (v <= 1),
+    }
+
+    for name, check in checks.items():
+        bad = np.flatnonzero(~check(columns[name]))
+        if len(bad):
+            raise ValueError(
+                f"{len(bad)} invalid {name} value(s), "
+                f"first at row {offset + int(bad[0])}: {columns[name][bad[0]]}"
+            )
@@ -0,0 +1,282 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from collections.abc import Mapping
+from pathlib import Path
+
+import numpy as np
+
+from defi_risk_agent.scoring.risk_surface import aggregate_risk_surface
+from defi_risk_agent.simulator import is_multi_asset, single_collateral_equivalent
+from defi_risk_agent.strategy import as_strategy
+from defi_risk_agent.stress.scenario_matrix import (
+    BORROW_MULTIPLIERS,
+    PRICE_SHOCKS,
+    VOLATILITY_REGIMES,
+    run_scenario_matrix,
+)
+
+# Bump when cached result formats or simulation semantics change
+CACHE_VERSION = 2
+
+
+# =========================================================
+# Stable content hash
+# =========================================================
+
+def _canonical(obj):
+    if isinstance(obj, Mapping):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return _canonical(obj.tolist())
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+
+def stable_hash(*parts) -> str:
+    """
+    SHA-256 of a canonical JSON encoding of parts.
+    Mappings hash by content (key order does not matter), so a Strategy
+    and the equivalent plain dict produce the same key. Mappings whose
+    order is significant must be passed as lists of (key, value) pairs.
+    """
+    payload = json.dumps(
+        [CACHE_VERSION, _canonical(parts)],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# =========================================================
+# Two-tier LRU cache
+# =========================================================
+
+class ResultCache:
+    """
+    Size-bounded memoization cache.
+
+    Tier 1 is an in-process LRU of at most max_entries results.
+    Tier 2 (optional) is a directory of pickles bounded by
+    max_disk_bytes, evicted least-recently-used by file mtime.
+    Cached values are shared, not copied: treat them as read-only.
+
+    Pickling a ResultCache (e.g. into a process pool worker) carries
+    only its configuration; each process keeps its own memory tier
+    and counters, while the disk tier is shared.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        directory=None,
+        max_disk_bytes: int = None,
+    ):
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory is not None else None
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def __getstate__(self):
+        return (self.max_entries, self.directory, self.max_disk_bytes)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get_or_compute(self, key: str, compute):
+        """
+        Return the cached value for key, computing and storing it on a miss.
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        value = self._read_disk(key)
+        if value is not None:
+            self.disk_hits += 1
+            self._remember(key, value)
+            return value
+
+        self.misses += 1
+        value = compute()
+        self._remember(key, value)
+        self._write_disk(key, value)
+
+        return value
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def clear(self, disk: bool = False):
+        self._memory.clear()
+        if disk and self.directory is not None:
+            for path in self.directory.glob("*/*.pkl"):
+                path.unlink(missing_ok=True)
+
+    # Memory tier
+
+    def _remember(self, key: str, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    # Disk tier
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.pkl"
+
+    def _read_disk(self, key: str):
+        if self.directory is None:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+        # Mark as recently used for eviction
+        os.utime(path)
+        return value
+
+    def _write_disk(self, key: str, value):
+        if self.directory is None:
+            return
+
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+
+        # Atomic publish so concurrent readers never see partial files
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+        if self.max_disk_bytes is not None:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        files = []
+        total = 0
+        for path in self.directory.glob("*/*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        for _, size, path in sorted(files, key=lambda f: f[0]):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+# =========================================================
+# Memoized simulations
+# =========================================================
+
+def _scenario_inputs(strategy) -> dict:
+    """
+    The only strategy parameters a scenario matrix depends on. A
+    collateral basket depends on its legs, prices and covariance, so
+    its sections are hashed whole.
+    """
+    if is_multi_asset(strategy):
+        return {name: strategy[name] for name in ("position", "market", "protocol")}
+
+    return {
+        "collateral_amount": strategy.collateral_amount,
+        "collateral_price": strategy.collateral_price,
+        "borrowed_amount": strategy.borrowed_amount,
+        "liquidation_threshold": strategy.liquidation_threshold,
+    }
+
+
+def _grid_key(price_shocks, borrow_multipliers, volatility_regimes: dict):
+    """
+    The grid definition as hashed. Regime order sets the order of the
+    result rows, so regimes are hashed as an ordered list of pairs.
+    """
+    return (price_shocks, borrow_multipliers, list(volatility_regimes.items()))
+
+
+def cached_scenario_matrix(
+    strategy,
+    cache: ResultCache = None,
+    price_shocks=PRICE_SHOCKS,
+    borrow_multipliers=BORROW_MULTIPLIERS,
+    volatility_regimes: dict = VOLATILITY_REGIMES,
+):
+    """
+    run_scenario_matrix, memoized on the position and the grid definition.
+    """
+    strategy = as_strategy(strategy)
+    grid = (price_shocks, borrow_multipliers, volatility_regimes)
+
+    def compute():
+        return run_scenario_matrix(strategy, *grid)
+
+    if cache is None:
+        return compute()
+
+    key = stable_hash("scenario_matrix", _scenario_inputs(strategy), _grid_key(*grid))
+    return cache.get_or_compute(key, compute)
+
+
+def cached_risk_surface(
+    strategy,
+    cache: ResultCache = None,
+    keep_enriched: bool = True,
+    price_shocks=PRICE_SHOCKS,
+    borrow_multipliers=BORROW_MULTIPLIERS,
+    volatility_regimes: dict = VOLATILITY_REGIMES,
+):
+    """
+    aggregate_risk_surface over the strategy's scenario matrix,
+    memoized on the same key plus keep_enriched.
+    """
+    strategy = as_strategy(strategy)
+    grid = (price_shocks, borrow_multipliers, volatility_regimes)
+
+    def compute():
+        return aggregate_risk_surface(
+            cached_scenario_matrix(strategy, cache, *grid),
+            single_collateral_equivalent(strategy).liquidation_threshold,
+            keep_enriched,
+        )
+
+    if cache is None:
+        return compute()
+
+    key = stable_hash(
+        "risk_surface", _scenario_inputs(strategy), _grid_key(*grid), keep_enriched
+    )
+    return cache.get_or_compute(key, compute)
@@ -0,0 +1,205 @@
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# =========================================================
+# Single entry point: python -m defi_risk_agent <command> ...
+#
+# Keep this module's imports to the standard library. Every command
+# imports its implementation only when it runs, so a cron job pays for
+# numpy / yaml / matplotlib only if its command needs them.
+# =========================================================
+
+# command -> (module exposing main(argv), or None if defined here; help)
+COMMANDS = {
+    "report": ("defi_risk_agent.reports.generate_report", "generate the risk report"),
+    "explain": ("defi_risk_agent.explain.explain", "explain the latest report"),
+    "viz": ("defi_risk_agent.viz.visualize", "plot the latest risk surface"),
+    "sweep": (None, "run a Phase 2 sweep and print JSON"),
+    "startup": (None, "check import time against a budget"),
+}
+
+SWEEPS = ("governance", "strategies", "protocols", "hyper")
+
+# Modules that must import without pulling in any HEAVY_MODULES
+LIGHT_MODULES = (
+    "defi_risk_agent.cli",
+    "defi_risk_agent.simulator",
+    "defi_risk_agent.explain.explain",
+    "defi_risk_agent.viz.visualize",
+)
+HEAVY_MODULES = ("numpy", "yaml", "pandas", "matplotlib", "concurrent.futures.process")
+STARTUP_BUDGET_MS = 50.0
+
+
+# =========================================================
+# sweep
+# =========================================================
+
+def sweep_main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="defi_risk_agent sweep", description=COMMANDS["sweep"][1]
+    )
+    parser.add_argument("kind", choices=SWEEPS)
+    parser.add_argument("--strategy", default="strategy.yaml",
+                        help="strategy YAML, relative to the package root")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    from defi_risk_agent.simulator import load_strategy
+
+    strategy = load_strategy(args.strategy)
+
+    if args.kind == "governance":
+        from defi_risk_agent.phase2.governance_stress import run_governance_stress
+
+        result = run_governance_stress(strategy, workers=args.workers)
+
+    elif args.kind == "strategies":
+        from defi_risk_agent.phase2.strategy_comparison import run_strategy_comparison
+
+        result = run_strategy_comparison(
+            strategy, strategy.liquidation_threshold, workers=args.workers
+        )
+
+    elif args.kind == "protocols":
+        from defi_risk_agent.phase2.multi_protocol_runner import (
+            run_multi_protocol_analysis,
+        )
+
+        result = run_multi_protocol_analysis(strategy, workers=args.workers)
+
+    else:
+        from defi_risk_agent.phase2.hyper_sweep import (
+            run_hyper_sweep,
+            zone_counts,
+            zone_summary,
+        )
+
+        sweep = run_hyper_sweep(strategy)
+        result = {"total": zone_summary(zone_counts(sweep))}
+        for axis in ("governance", "protocol", "strategy", "volatility_regime"):
+            result[axis] = {
+                label: zone_summary(counts)
+                for label, counts in zip(
+                    sweep["axes"][axis], zone_counts(sweep, keep=(axis,))
+                )
+            }
+
+    text = json.dumps(result, indent=2, default=_json_default)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+def _json_default(value):
+    # NumPy scalars and arrays, without importing numpy here
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+# =========================================================
+# startup
+# =========================================================
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed * 1000)
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def measure_import(module: str, repeat: int = 5) -> dict:
+    """
+    Best-of-repeat import time of module in a fresh interpreter, and
+    which HEAVY_MODULES the import pulled in.
+    """
+    env = dict(os.environ)
+    root = str(Path(__file__).resolve().parent.parent)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.splitlines()
+        timings.append(float(output[0]))
+
+    return {
+        "import_ms": round(min(timings), 2),
+        "heavy_imports": [m for m in output[1].split(",") if m],
+    }
+
+
+def startup_main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="defi_risk_agent startup", description=COMMANDS["startup"][1]
+    )
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in LIGHT_MODULES:
+        result = measure_import(module, args.repeat)
+        over_budget = result["import_ms"] > args.budget_ms
+
+        status = "ok"
+        if over_budget or result["heavy_imports"]:
+            failed = True
+            status = "FAIL"
+
+        heavy = ", ".join(result["heavy_imports"]) or "-"
+        print(f"{status:<4} {module:<36} {result['import_ms']:>8.2f} ms  heavy: {heavy}")
+
+    if failed:
+        print(f"Import budget of {args.budget_ms} ms exceeded or heavy modules loaded")
+        sys.exit(1)
+
+
+# =========================================================
+# Dispatch
+# =========================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="defi_risk_agent",
+        description="DeFi risk agent",
+        epilog="commands:\n" + "\n".join(
+            f"  {name:<10} {help_text}" for name, (_, help_text) in COMMANDS.items()
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=COMMANDS, metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER,
+                        help="arguments for the command (see <command> --help)")
+    args = parser.parse_args(argv)
+
+    module_name = COMMANDS[args.command][0]
+
+    if module_name is None:
+        command = {"sweep": sweep_main, "startup": startup_main}[args.command]
+    else:
+        command = importlib.import_module(module_name).main
+
+    command(args.args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,4 @@
-import json
-from pathlib import Path
-
-
-# =========================================================
-# Load report (READ-ONLY)
-# =========================================================
-
-BASE_DIR = Path(__file__).resolve().parents[1]
-REPORT_PATH = BASE_DIR / "reports" / "latest.json"
-
-with open(REPORT_PATH, "r") as f:
-    report = json.load(f)
+import argparse
 
 
 # =========================================================
@@ -26,17 +14,29 @@ def explain_base_risk(base: dict) -> str:
     )
 
 
-def explain_price_risk(price_shocks: list) -> str:
-    for p in price_shocks:
-        if p["liquidated"]:
-            return (
-                f"Liquidation first occurs at approximately a "
-                f"{p['price_drop_pct']}% price drop, "
-                f"indicating a relatively narrow safety margin."
-            )
+def explain_price_risk(base: dict) -> str:
+    drop_pct = base["liquidation_drop_pct"]
+
+    # Multi-asset baskets have no single liquidation price
+    at_price = (
+        ""
+        if base.get("liquidation_price") is None
+        else f" (collateral price {base['liquidation_price']})"
+    )
+
+    if drop_pct == 0:
+        return (
+            "The position is already beyond its liquidation threshold"
+            f"{at_price}."
+        )
+    if drop_pct < 40:
+        return (
+            f"Liquidation begins at a {drop_pct}% price drop{at_price}, "
+            f"indicating a relatively narrow safety margin."
+        )
     return (
-        "No liquidation was observed under the tested price shock scenarios, "
-        "indicating strong resilience to direct price declines."
+        f"Liquidation only begins after a {drop_pct}% price drop{at_price}, "
+        f"indicating strong resilience to direct price declines."
     )
 
 
@@ -83,19 +83,35 @@ def explain_dominant_risk() -> str:
 # Generate explanation
 # =========================================================
 
-explanation = {
-    "base_risk": explain_base_risk(report["base"]),
-    "price_risk": explain_price_risk(report["price_shocks"]),
-    "volatility_risk": explain_volatility(report["volatility_regimes"]),
-    "risk_surface": explain_surface(report["risk_surface"]["summary"]),
-    "dominant_risk_driver": explain_dominant_risk(),
-}
+def build_explanation(report: dict) -> dict:
+    return {
+        "base_risk": explain_base_risk(report["base"]),
+        "price_risk": explain_price_risk(report["base"]),
+        "volatility_risk": explain_volatility(report["volatility_regimes"]),
+        "risk_surface": explain_surface(report["risk_surface"]["summary"]),
+        "dominant_risk_driver": explain_dominant_risk(),
+    }
 
 
 # =========================================================
 # Output (read-only narrative)
 # =========================================================
 
-for section, text in explanation.items():
-    print(f"\n--- {section.replace('_', ' ').upper()} ---")
-    print(text)
+def main(argv=None):
+    """
+    Explanations only need scalars and summaries: the manifest,
+    never the matrix columns.
+    """
+    from defi_risk_agent.reports.columnar import load_manifest
+
+    argparse.ArgumentParser(description="Explain the latest risk report").parse_args(argv)
+
+    explanation = build_explanation(load_manifest())
+
+    for section, text in explanation.items():
+        print(f"\n--- {section.replace('_', ' ').upper()} ---")
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
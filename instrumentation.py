@@ -0,0 +1,280 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# =========================================================
+# Opt-in hot-path instrumentation
+#
+# Public functions in stress/, scoring/ and phase2/ are wrapped with
+# @instrumented. While disabled (the default) a wrapped call costs one
+# attribute check; enable() starts recording wall time, self time,
+# call counts, scenarios evaluated and, optionally, allocations.
+#
+# Per-scenario scalar kernels (classify_risk_zone) stay unwrapped; the
+# functions that loop over them are instrumented instead.
+#
+# Only the current process is recorded: work shipped to a process
+# pool (run_sweep with workers > 1, the service) is not.
+# =========================================================
+
+PACKAGE_PREFIX = "defi_risk_agent."
+
+
+class _State:
+    def __init__(self):
+        self.enabled = False
+        self.track_allocations = False
+        self.owns_tracemalloc = False
+        self.trace = True
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.origin = time.perf_counter()
+        self.stats = {}
+        self.events = []
+
+
+_STATE = _State()
+
+# Returned by next() when an instrumented generator is exhausted
+_DONE = object()
+
+
+class _Frame:
+    __slots__ = ("child_time", "memory_start", "memory_peak")
+
+    def __init__(self, memory_start: int = 0):
+        self.child_time = 0.0
+        self.memory_start = memory_start
+        self.memory_peak = memory_start
+
+
+def _stack() -> list:
+    stack = getattr(_STATE.local, "stack", None)
+    if stack is None:
+        stack = _STATE.local.stack = []
+    return stack
+
+
+# =========================================================
+# Decorator
+# =========================================================
+
+def instrumented(fn=None, *, name: str = None, scenarios=None):
+    """
+    Record calls of fn while instrumentation is enabled.
+
+    scenarios, if given, maps the return value to the number of
+    scenarios it evaluated (e.g. len, or lambda r: r["ltv"].size).
+    Generator functions are timed per yielded item.
+    """
+    if fn is None:
+        return functools.partial(instrumented, name=name, scenarios=scenarios)
+
+    label = name or f"{fn.__module__.removeprefix(PACKAGE_PREFIX)}.{fn.__qualname__}"
+
+    if inspect.isgeneratorfunction(fn):
+        def counter(item):
+            return 0 if item is _DONE or scenarios is None else scenarios(item)
+
+        @functools.wraps(fn)
+        def generator_wrapper(*args, **kwargs):
+            if not _STATE.enabled:
+                yield from fn(*args, **kwargs)
+                return
+
+            iterator = fn(*args, **kwargs)
+            while True:
+                item = _record(label, counter, next, (iterator, _DONE), {})
+                if item is _DONE:
+                    return
+                yield item
+
+        return generator_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _STATE.enabled:
+            return fn(*args, **kwargs)
+        return _record(label, scenarios, fn, args, kwargs)
+
+    return wrapper
+
+
+def _record(label: str, scenarios, fn, args, kwargs):
+    stack = _stack()
+    track = _STATE.track_allocations and tracemalloc.is_tracing()
+
+    if track:
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1].memory_peak = max(stack[-1].memory_peak, peak)
+        tracemalloc.reset_peak()
+        frame = _Frame(current)
+    else:
+        frame = _Frame()
+
+    stack.append(frame)
+    start = time.perf_counter()
+    failed = True
+
+    try:
+        result = fn(*args, **kwargs)
+        failed = False
+        return result
+    finally:
+        elapsed = time.perf_counter() - start
+        stack.pop()
+
+        allocated = 0
+        if track:
+            frame.memory_peak = max(frame.memory_peak, tracemalloc.get_traced_memory()[1])
+            allocated = frame.memory_peak - frame.memory_start
+            if stack:
+                stack[-1].memory_peak = max(stack[-1].memory_peak, frame.memory_peak)
+
+        if stack:
+            stack[-1].child_time += elapsed
+
+        count = 0
+        if scenarios is not None and not failed:
+            count = int(scenarios(result))
+
+        _add_sample(
+            label, start, elapsed, elapsed - frame.child_time, count, allocated, failed
+        )
+
+
+def _add_sample(label, start, elapsed, self_time, scenarios, allocated, failed):
+    with _STATE.lock:
+        entry = _STATE.stats.get(label)
+        if entry is None:
+            entry = _STATE.stats[label] = {
+                "calls": 0,
+                "errors": 0,
+                "total_s": 0.0,
+                "self_s": 0.0,
+                "max_s": 0.0,
+                "scenarios": 0,
+                "peak_alloc_bytes": 0,
+            }
+
+        entry["calls"] += 1
+        entry["errors"] += failed
+        entry["total_s"] += elapsed
+        entry["self_s"] += self_time
+        entry["max_s"] = max(entry["max_s"], elapsed)
+        entry["scenarios"] += scenarios
+        entry["peak_alloc_bytes"] = max(entry["peak_alloc_bytes"], allocated)
+
+        if _STATE.trace:
+            _STATE.events.append({
+                "name": label,
+                "cat": label.split(".", 1)[0],
+                "ph": "X",
+                "ts": (start - _STATE.origin) * 1e6,
+                "dur": elapsed * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": {"scenarios": scenarios, "alloc_bytes": allocated},
+            })
+
+
+# =========================================================
+# Control
+# =========================================================
+
+def enable(track_allocations: bool = False, trace: bool = True):
+    """
+    Start recording. track_allocations starts tracemalloc, which slows
+    allocation-heavy code down noticeably; trace keeps one Chrome trace
+    event per call.
+    """
+    _STATE.track_allocations = track_allocations
+    _STATE.trace = trace
+
+    if track_allocations and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _STATE.owns_tracemalloc = True
+
+    _STATE.enabled = True
+
+
+def disable():
+    _STATE.enabled = False
+
+    if _STATE.owns_tracemalloc:
+        tracemalloc.stop()
+        _STATE.owns_tracemalloc = False
+    _STATE.track_allocations = False
+
+
+def reset():
+    with _STATE.lock:
+        _STATE.stats = {}
+        _STATE.events = []
+        _STATE.origin = time.perf_counter()
+
+
+def is_enabled() -> bool:
+    return _STATE.enabled
+
+
+@contextmanager
+def profile(track_allocations: bool = False, trace: bool = True):
+    """
+    Record the enclosed block from a clean slate.
+    """
+    reset()
+    enable(track_allocations, trace)
+    try:
+        yield
+    finally:
+        disable()
+
+
+# =========================================================
+# Export
+# =========================================================
+
+def summary() -> dict:
+    """
+    Per-function totals, slowest (by self time) first.
+    """
+    with _STATE.lock:
+        stats = {label: dict(entry) for label, entry in _STATE.stats.items()}
+
+    result = {}
+    for label, entry in sorted(stats.items(), key=lambda kv: -kv[1]["self_s"]):
+        result[label] = {
+            "calls": entry["calls"],
+            "errors": entry["errors"],
+            "total_s": round(entry["total_s"], 6),
+            "self_s": round(entry["self_s"], 6),
+            "mean_ms": round(entry["total_s"] / entry["calls"] * 1000, 4),
+            "max_ms": round(entry["max_s"] * 1000, 4),
+            "scenarios": entry["scenarios"],
+            "peak_alloc_bytes": entry["peak_alloc_bytes"],
+        }
+
+    return result
+
+
+def write_summary(path):
+    with open(path, "w") as f:
+        json.dump(summary(), f, indent=2)
+
+
+def write_chrome_trace(path):
+    """
+    Trace Event Format JSON, viewable in chrome://tracing or Perfetto.
+    """
+    with _STATE.lock:
+        events = list(_STATE.events)
+
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,153 @@
+import asyncio
+
+from defi_risk_agent.cache import stable_hash
+
+# =========================================================
+# Request-coalescing micro-batcher
+# =========================================================
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-item requests into batched evaluations.
+
+    The first request of a batch opens a window of max_wait seconds;
+    the batch is evaluated when the window closes or max_batch_size
+    distinct items are queued, whichever comes first. Identical items
+    (same stable_hash) queued together are evaluated once and share the
+    result.
+
+    evaluate_batch is an async callable taking a list of items and
+    returning one result per item, in order. If a batch fails, its
+    items are re-evaluated one by one so that a bad item fails only its
+    own requests.
+    """
+
+    def __init__(
+        self,
+        evaluate_batch,
+        max_batch_size: int = 256,
+        max_wait: float = 0.002,
+        key=stable_hash,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.evaluate_batch = evaluate_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.key = key
+
+        # key -> (item, future), in arrival order
+        self._pending = {}
+        self._timer = None
+        self._tasks = set()
+
+        self.requests = 0
+        self.deduplicated = 0
+        self.batches = 0
+        self.evaluated = 0
+        self.failed_batches = 0
+
+    async def submit(self, item):
+        """
+        Queue one item and wait for its result.
+        """
+        self.requests += 1
+        key = self.key(item)
+
+        if key in self._pending:
+            self.deduplicated += 1
+            future = self._pending[key][1]
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = (item, future)
+
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(
+                    self.max_wait, self._flush
+                )
+
+        # Several callers may await the same future
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._pending:
+            return
+
+        batch, self._pending = list(self._pending.values()), {}
+        task = asyncio.get_running_loop().create_task(self._evaluate(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _evaluate(self, batch: list):
+        self.batches += 1
+        self.evaluated += len(batch)
+
+        try:
+            results = await self._evaluate_items([item for item, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                _settle(batch[0][1], error=e)
+                return
+
+            # Isolate the failing items
+            self.failed_batches += 1
+            await asyncio.gather(*(self._evaluate_one(entry) for entry in batch))
+            return
+
+        for (_, future), result in zip(batch, results):
+            _settle(future, result)
+
+    async def _evaluate_one(self, entry):
+        item, future = entry
+        try:
+            result = (await self._evaluate_items([item]))[0]
+        except Exception as e:
+            _settle(future, error=e)
+        else:
+            _settle(future, result)
+
+    async def _evaluate_items(self, items: list) -> list:
+        results = await self.evaluate_batch(items)
+        if len(results) != len(items):
+            raise RuntimeError(
+                f"evaluate_batch returned {len(results)} results "
+                f"for {len(items)} items"
+            )
+        return results
+
+    async def drain(self):
+        """
+        Evaluate anything still queued and wait for in-flight batches.
+        """
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "deduplicated": self.deduplicated,
+            "batches": self.batches,
+            "evaluated": self.evaluated,
+            "failed_batches": self.failed_batches,
+            "mean_batch_size": round(self.evaluated / self.batches, 2)
+            if self.batches
+            else 0.0,
+        }
+
+
+def _settle(future, result=None, error: Exception = None):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
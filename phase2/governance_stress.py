@@ -21,35 +21,98 @@ GOVERNANCE_SHOCKS = [
 ]
 
 
-from copy import deepcopy
-from defi_risk_agent.stress.scenario_matrix import run_scenario_matrix
-from defi_risk_agent.scoring.risk_surface import aggregate_risk_surface
+from functools import partial
 
+from defi_risk_agent.cache import ResultCache, cached_risk_surface
+from defi_risk_agent.instrumentation import instrumented
+from defi_risk_agent.phase2.sweep import run_sweep
+from defi_risk_agent.simulator import (
+    collateral_basket,
+    is_multi_asset,
+    weighted_liquidation_threshold,
+)
+from defi_risk_agent.strategy import as_strategy
 
-def run_governance_stress(base_strategy: dict):
+
+def apply_liquidation_threshold(strategy, threshold: float):
     """
-    Apply governance-driven liquidation threshold changes
-    to the same user position and measure risk surface shifts.
+    Strategy with its liquidation threshold set by governance.
+
+    A collateral basket's per-asset thresholds all move by the same
+    amount, so that its value-weighted threshold becomes threshold.
+    """
+    strategy = as_strategy(strategy)
+    if not is_multi_asset(strategy):
+        return strategy.override("protocol", liquidation_threshold=threshold)
+
+    basket = collateral_basket(strategy)
+    delta = threshold - weighted_liquidation_threshold(basket)
+    asset_thresholds = {
+        asset: asset_threshold + delta
+        for asset, _, _, asset_threshold in basket
+    }
+
+    return strategy.override(
+        "protocol",
+        liquidation_threshold=threshold,
+        asset_thresholds=asset_thresholds,
+    )
+
+
+@instrumented
+def evaluate_governance_shock(
+    base_strategy: dict,
+    shock: dict,
+    cache: ResultCache = None,
+):
+    """
+    Risk surface summary of one position under one governance shock.
     """
-    results = []
+    # Apply governance change
+    strategy = apply_liquidation_threshold(base_strategy, shock["liquidation_threshold"])
 
-    for shock in GOVERNANCE_SHOCKS:
-        strategy = deepcopy(base_strategy)
+    risk_surface = cached_risk_surface(strategy, cache, keep_enriched=False)
 
-        # Apply governance change
-        strategy["protocol"]["liquidation_threshold"] = shock["liquidation_threshold"]
+    return {
+        "governance_scenario": shock["name"],
+        "liquidation_threshold": shock["liquidation_threshold"],
+        "risk_summary": risk_surface["summary"]
+    }
 
-        scenario_matrix = run_scenario_matrix(strategy)
 
-        risk_surface = aggregate_risk_surface(
-            scenario_matrix,
-            shock["liquidation_threshold"]
-        )
+@instrumented(scenarios=len)
+def run_governance_stress(
+    base_strategy: dict,
+    shocks=GOVERNANCE_SHOCKS,
+    workers: int = None,
+    chunksize: int = None,
+    cache: ResultCache = None,
+):
+    """
+    Apply governance-driven liquidation threshold changes
+    to the same user position and measure risk surface shifts.
+    """
+    return run_governance_stress_book(
+        [base_strategy], shocks, workers, chunksize, cache
+    )[0]
 
-        results.append({
-            "governance_scenario": shock["name"],
-            "liquidation_threshold": shock["liquidation_threshold"],
-            "risk_summary": risk_surface["summary"]
-        })
 
-    return results
+@instrumented
+def run_governance_stress_book(
+    strategies,
+    shocks=GOVERNANCE_SHOCKS,
+    workers: int = None,
+    chunksize: int = None,
+    cache: ResultCache = None,
+):
+    """
+    Governance stress for every position in a book.
+    Returns one result list per position, in input order.
+    """
+    return run_sweep(
+        partial(evaluate_governance_shock, cache=cache),
+        [as_strategy(s) for s in strategies],
+        shocks,
+        workers,
+        chunksize,
+    )
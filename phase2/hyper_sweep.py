@@ -0,0 +1,160 @@
+# Phase 2 — Hyper-Sweep
+# Governance x protocol x strategy x scenario as one zone tensor
+
+import numpy as np
+
+from defi_risk_agent.instrumentation import instrumented
+from defi_risk_agent.phase2.governance_stress import GOVERNANCE_SHOCKS
+from defi_risk_agent.phase2.protocols import PROTOCOLS
+from defi_risk_agent.phase2.strategy_comparison import STRATEGY_VARIANTS
+from defi_risk_agent.scoring.risk_surface import RISK_ZONES, classify_risk_zone_codes
+from defi_risk_agent.simulator import require_single_collateral
+from defi_risk_agent.strategy import as_strategy
+from defi_risk_agent.stress.scenario_matrix import (
+    BORROW_MULTIPLIERS,
+    PRICE_SHOCKS,
+    VOLATILITY_REGIMES,
+    scenario_effective_drop,
+    scenario_ltv,
+)
+
+AXES = (
+    "governance",
+    "protocol",
+    "strategy",
+    "price_shock",
+    "borrow_multiplier",
+    "volatility_regime",
+)
+
+
+@instrumented
+def governance_deltas(governance_shocks=GOVERNANCE_SHOCKS):
+    """
+    Express governance shocks as threshold changes relative to the
+    "baseline" shock (or the first shock if none is named baseline),
+    so they can be applied on top of any protocol.
+    """
+    baseline = next(
+        (s for s in governance_shocks if s["name"] == "baseline"),
+        governance_shocks[0],
+    )
+
+    return np.array([
+        s["liquidation_threshold"] - baseline["liquidation_threshold"]
+        for s in governance_shocks
+    ])
+
+
+@instrumented(scenarios=lambda r: r["zones"].size)
+def run_hyper_sweep(
+    base_strategy: dict,
+    governance_shocks=GOVERNANCE_SHOCKS,
+    protocols=PROTOCOLS,
+    strategy_variants=STRATEGY_VARIANTS,
+    price_shocks=PRICE_SHOCKS,
+    borrow_multipliers=BORROW_MULTIPLIERS,
+    volatility_regimes: dict = VOLATILITY_REGIMES,
+):
+    """
+    Evaluate the full governance x protocol x strategy x price shock
+    x borrow multiplier x volatility regime product in one pass.
+
+    LTV does not depend on the liquidation threshold, so it is computed
+    once over (strategy, shock, borrow, regime) and broadcast against the
+    (governance, protocol) threshold table when classifying zones.
+    """
+    base_strategy = as_strategy(base_strategy)
+    require_single_collateral(base_strategy, "run_hyper_sweep")
+
+    variant_multipliers = np.array(
+        [v["borrow_multiplier"] for v in strategy_variants], dtype=float
+    )
+    vol_multipliers = [volatility_regimes[r] for r in volatility_regimes]
+
+    effective_drop = scenario_effective_drop(price_shocks, vol_multipliers)
+    ltv = scenario_ltv(
+        base_strategy.collateral_amount,
+        base_strategy.collateral_price,
+        base_strategy.borrowed_amount * variant_multipliers,
+        effective_drop,
+        borrow_multipliers,
+    )
+    ltv_pct = np.round(ltv * 100, 2)
+
+    # (G, P) — rounded so that e.g. 0.80 - 0.02 compares as 0.78
+    liquidation_threshold = np.round(
+        np.array([p["liquidation_threshold"] for p in protocols])[None, :]
+        + governance_deltas(governance_shocks)[:, None],
+        10,
+    )
+
+    zones = classify_risk_zone_codes(
+        ltv_pct[None, None],
+        liquidation_threshold[:, :, None, None, None, None] * 100,
+    )
+
+    return {
+        "axes": {
+            "governance": [s["name"] for s in governance_shocks],
+            "protocol": [p["name"] for p in protocols],
+            "strategy": [v["name"] for v in strategy_variants],
+            "price_shock": [round(s * 100, 1) for s in price_shocks],
+            "borrow_multiplier": list(borrow_multipliers),
+            "volatility_regime": list(volatility_regimes),
+        },
+        "liquidation_threshold": liquidation_threshold,
+        "ltv_pct": ltv_pct,
+        "zones": zones,
+    }
+
+
+# =========================================================
+# Reductions
+# =========================================================
+
+@instrumented
+def zone_counts(sweep: dict, keep=(), where: dict = None):
+    """
+    Count scenarios per risk zone, summing over every axis not in keep.
+
+    where fixes axes to a single label before reducing,
+    e.g. where={"protocol": "Aave-like"}.
+    Returns an int array of shape (*kept axis lengths, len(RISK_ZONES)).
+    """
+    zones = sweep["zones"]
+    axes = list(AXES)
+
+    for axis, label in (where or {}).items():
+        i = axes.index(axis)
+        zones = np.take(zones, sweep["axes"][axis].index(label), axis=i)
+        axes.pop(i)
+
+    kept = [a for a in keep if a in axes]
+    zones = np.moveaxis(zones, [axes.index(a) for a in kept], range(len(kept)))
+    reduce_axes = tuple(range(len(kept), zones.ndim))
+
+    return np.stack(
+        [(zones == code).sum(axis=reduce_axes) for code in range(len(RISK_ZONES))],
+        axis=-1,
+    )
+
+
+@instrumented
+def zone_summary(counts) -> dict:
+    """
+    Summary dict (same format as aggregate_risk_surface) for one
+    1-D vector of zone counts.
+    """
+    total = int(counts.sum())
+
+    return {
+        "total_scenarios": total,
+        "zone_distribution": {
+            zone: {
+                "count": int(count),
+                "pct": round(int(count) / total * 100, 2)
+            }
+            for zone, count in zip(RISK_ZONES, counts)
+        }
+    }
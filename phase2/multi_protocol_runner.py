@@ -1,28 +1,54 @@
-from copy import deepcopy
+from functools import partial
 
+from defi_risk_agent.cache import ResultCache, cached_risk_surface
+from defi_risk_agent.instrumentation import instrumented
 from defi_risk_agent.phase2.protocols import PROTOCOLS
-from defi_risk_agent.stress.scenario_matrix import run_scenario_matrix
-from defi_risk_agent.scoring.risk_surface import aggregate_risk_surface
-
-
-def run_multi_protocol_analysis(base_strategy: dict):
-    results = []
-
-    for protocol in PROTOCOLS:
-        strategy = deepcopy(base_strategy)
-        strategy["protocol"] = protocol
-
-        scenario_matrix = run_scenario_matrix(strategy)
-
-        risk_surface = aggregate_risk_surface(
-            scenario_matrix,
-            protocol["liquidation_threshold"]
-        )
-
-        results.append({
-            "protocol": protocol["name"],
-            "liquidation_threshold": protocol["liquidation_threshold"],
-            "summary": risk_surface["summary"]
-        })
-
-    return results
+from defi_risk_agent.phase2.sweep import run_sweep
+from defi_risk_agent.strategy import as_strategy
+
+
+@instrumented
+def evaluate_protocol(
+    base_strategy: dict,
+    protocol: dict,
+    cache: ResultCache = None,
+):
+    strategy = as_strategy(base_strategy).with_section("protocol", protocol)
+
+    risk_surface = cached_risk_surface(strategy, cache, keep_enriched=False)
+
+    return {
+        "protocol": protocol["name"],
+        "liquidation_threshold": protocol["liquidation_threshold"],
+        "summary": risk_surface["summary"]
+    }
+
+
+@instrumented(scenarios=len)
+def run_multi_protocol_analysis(
+    base_strategy: dict,
+    protocols=PROTOCOLS,
+    workers: int = None,
+    chunksize: int = None,
+    cache: ResultCache = None,
+):
+    return run_multi_protocol_book(
+        [base_strategy], protocols, workers, chunksize, cache
+    )[0]
+
+
+@instrumented
+def run_multi_protocol_book(
+    strategies,
+    protocols=PROTOCOLS,
+    workers: int = None,
+    chunksize: int = None,
+    cache: ResultCache = None,
+):
+    return run_sweep(
+        partial(evaluate_protocol, cache=cache),
+        [as_strategy(s) for s in strategies],
+        protocols,
+        workers,
+        chunksize,
+    )
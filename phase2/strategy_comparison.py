@@ -16,46 +16,88 @@ STRATEGY_VARIANTS = [
     }
 ]
 
-from copy import deepcopy
+from functools import partial
 
-from defi_risk_agent.stress.scenario_matrix import run_scenario_matrix
-from defi_risk_agent.scoring.risk_surface import aggregate_risk_surface
+from defi_risk_agent.cache import ResultCache, cached_risk_surface
+from defi_risk_agent.instrumentation import instrumented
+from defi_risk_agent.phase2.sweep import run_sweep
+from defi_risk_agent.strategy import as_strategy
 
 
-def run_strategy_comparison(
+@instrumented
+def evaluate_strategy_variant(
     base_strategy: dict,
+    variant: dict,
     liquidation_threshold: float,
+    cache: ResultCache = None,
 ):
     """
-    Compare leverage strategies under identical conditions.
-    Only borrowed amount changes; everything else is fixed.
+    Risk surface summary of one leverage variant of a position.
     """
-    results = []
-
-    base_borrowed = base_strategy["position"]["borrowed_amount"]
-
-    for variant in STRATEGY_VARIANTS:
-        strategy = deepcopy(base_strategy)
+    base_strategy = as_strategy(base_strategy)
 
+    strategy = (
+        base_strategy
         # Apply strategy choice (user decision)
-        strategy["position"]["borrowed_amount"] = (
-            base_borrowed * variant["borrow_multiplier"]
+        .override(
+            "position",
+            borrowed_amount=(
+                base_strategy.borrowed_amount * variant["borrow_multiplier"]
+            ),
         )
-
         # Keep protocol rule fixed
-        strategy["protocol"]["liquidation_threshold"] = liquidation_threshold
+        .override("protocol", liquidation_threshold=liquidation_threshold)
+    )
 
-        scenario_matrix = run_scenario_matrix(strategy)
+    risk_surface = cached_risk_surface(strategy, cache, keep_enriched=False)
 
-        risk_surface = aggregate_risk_surface(
-            scenario_matrix,
-            liquidation_threshold
-        )
+    return {
+        "strategy": variant["name"],
+        "borrow_multiplier": variant["borrow_multiplier"],
+        "risk_summary": risk_surface["summary"]
+    }
+
+
+@instrumented(scenarios=len)
+def run_strategy_comparison(
+    base_strategy: dict,
+    liquidation_threshold: float,
+    variants=STRATEGY_VARIANTS,
+    workers: int = None,
+    chunksize: int = None,
+    cache: ResultCache = None,
+):
+    """
+    Compare leverage strategies under identical conditions.
+    Only borrowed amount changes; everything else is fixed.
+    """
+    return run_strategy_comparison_book(
+        [base_strategy], liquidation_threshold, variants, workers, chunksize,
+        cache,
+    )[0]
 
-        results.append({
-            "strategy": variant["name"],
-            "borrow_multiplier": variant["borrow_multiplier"],
-            "risk_summary": risk_surface["summary"]
-        })
 
-    return results
+@instrumented
+def run_strategy_comparison_book(
+    strategies,
+    liquidation_threshold: float,
+    variants=STRATEGY_VARIANTS,
+    workers: int = None,
+    chunksize: int = None,
+    cache: ResultCache = None,
+):
+    """
+    Strategy comparison for every position in a book.
+    Returns one result list per position, in input order.
+    """
+    return run_sweep(
+        partial(
+            evaluate_strategy_variant,
+            liquidation_threshold=liquidation_threshold,
+            cache=cache,
+        ),
+        [as_strategy(s) for s in strategies],
+        variants,
+        workers,
+        chunksize,
+    )
@@ -0,0 +1,46 @@
+# Shared sweep executor for Phase 2 runners
+# Fans (position x variant) work units out over a process pool
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+from defi_risk_agent.instrumentation import instrumented
+
+
+@instrumented(scenarios=lambda r: sum(len(row) for row in r))
+def run_sweep(
+    evaluate,
+    strategies,
+    variants,
+    workers: int = None,
+    chunksize: int = None,
+):
+    """
+    Evaluate evaluate(strategy, variant) for every position and variant.
+
+    Results are returned as one list per strategy, each in variant order,
+    regardless of how many workers ran them. With workers None or 1 the
+    sweep runs serially in-process. evaluate must be a module-level
+    function (or functools.partial of one) so it can be pickled.
+    """
+    strategies = list(strategies)
+    variants = list(variants)
+
+    units = list(product(strategies, variants))
+
+    if not workers or workers <= 1 or len(units) <= 1:
+        flat = [evaluate(strategy, variant) for strategy, variant in units]
+    else:
+        if chunksize is None:
+            chunksize = max(1, len(units) // (workers * 4))
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            flat = list(pool.map(
+                evaluate,
+                [strategy for strategy, _ in units],
+                [variant for _, variant in units],
+                chunksize=chunksize,
+            ))
+
+    width = len(variants)
+    return [flat[i * width:(i + 1) * width] for i in range(len(strategies))]
@@ -0,0 +1,186 @@
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent
+OUTPUT_DIR = BASE_DIR / "latest"
+MANIFEST_NAME = "manifest.json"
+
+# Report sections stored as columns instead of JSON rows
+MATRIX_SECTIONS = (
+    ("scenario_matrix",),
+    ("risk_surface", "enriched_matrix"),
+)
+
+
+# =========================================================
+# Writer
+# =========================================================
+
+def _write_columns(rows: list, directory: Path, section: str) -> dict:
+    """
+    One .npy file per column. String columns are dictionary-encoded
+    (int32 codes + categories in the manifest).
+    """
+    columns = {}
+
+    for name in (rows[0] if rows else {}):
+        values = np.asarray([row[name] for row in rows])
+        entry = {"file": f"{section}.{name}.npy"}
+
+        if values.dtype.kind == "U":
+            categories, codes = np.unique(values, return_inverse=True)
+            values = codes.astype(np.int32)
+            entry["categories"] = categories.tolist()
+
+        np.save(directory / entry["file"], values, allow_pickle=False)
+        entry["dtype"] = values.dtype.str
+        columns[name] = entry
+
+    return {"columnar": True, "rows": len(rows), "columns": columns}
+
+
+def _owned_files(directory: Path) -> set:
+    """
+    Files a previous write_columnar_report put in directory: the
+    manifest and every column file it lists.
+    """
+    owned = {MANIFEST_NAME}
+
+    def collect(node):
+        if isinstance(node, dict):
+            if node.get("columnar"):
+                owned.update(entry["file"] for entry in node["columns"].values())
+            else:
+                for value in node.values():
+                    collect(value)
+
+    if (directory / MANIFEST_NAME).exists():
+        collect(load_manifest(directory))
+
+    return owned
+
+
+def _sibling_directory(directory: Path, tag: str) -> Path:
+    """
+    New hidden directory next to directory. Created with os.mkdir, not
+    tempfile.mkdtemp, so it gets the usual umask permissions instead of
+    0700 once it is published.
+    """
+    path = directory.parent / f".{directory.name}.{tag}.{uuid.uuid4().hex}"
+    path.mkdir()
+    return path
+
+
+def write_columnar_report(report: dict, directory=OUTPUT_DIR):
+    """
+    Write matrix sections as memory-mappable .npy columns and everything
+    else (scalars, small sections) as a JSON manifest.
+
+    The report is written to a sibling temporary directory and swapped
+    into place, so readers never see a half-written report and those
+    still mapping the previous columns keep valid files. An existing
+    directory is only replaced if it holds nothing but a previous
+    columnar report.
+    """
+    directory = Path(directory)
+
+    if directory.exists():
+        foreign = sorted(
+            p.name for p in directory.iterdir()
+            if p.name not in _owned_files(directory)
+        )
+        if foreign:
+            raise FileExistsError(
+                f"{directory} holds files that are not part of a columnar "
+                f"report: {', '.join(foreign[:5])}"
+            )
+
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    staging = _sibling_directory(directory, "new")
+
+    try:
+        manifest = dict(report)
+
+        for path in MATRIX_SECTIONS:
+            parent = manifest
+            for key in path[:-1]:
+                if key not in parent:
+                    break
+                parent[key] = dict(parent[key])
+                parent = parent[key]
+            else:
+                if path[-1] in parent:
+                    parent[path[-1]] = _write_columns(
+                        parent[path[-1]], staging, ".".join(path)
+                    )
+
+        with open(staging / MANIFEST_NAME, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        # A directory can't be replaced by rename unless it is empty, so
+        # move the old report aside first
+        previous = None
+        if directory.exists():
+            previous = _sibling_directory(directory, "old")
+            os.replace(directory, previous / directory.name)
+        os.replace(staging, directory)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if previous is not None:
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+# =========================================================
+# Readers
+# =========================================================
+
+def load_manifest(directory=OUTPUT_DIR) -> dict:
+    """
+    Scalars and small sections of a columnar report.
+    Matrix sections appear as column descriptors.
+    """
+    with open(Path(directory) / MANIFEST_NAME, "r") as f:
+        return json.load(f)
+
+
+def load_columns(
+    section: str,
+    columns=None,
+    directory=OUTPUT_DIR,
+    manifest: dict = None,
+    decode: bool = True,
+) -> dict:
+    """
+    Memory-map the requested columns of a matrix section
+    (e.g. "risk_surface.enriched_matrix"). Only the listed columns are
+    opened. Dictionary-encoded string columns are decoded unless
+    decode is False, in which case the int32 codes are returned.
+    """
+    directory = Path(directory)
+    if manifest is None:
+        manifest = load_manifest(directory)
+
+    descriptor = manifest
+    for key in section.split("."):
+        descriptor = descriptor[key]
+
+    names = list(descriptor["columns"]) if columns is None else list(columns)
+
+    result = {}
+    for name in names:
+        entry = descriptor["columns"][name]
+        values = np.load(directory / entry["file"], mmap_mode="r")
+
+        if decode and "categories" in entry:
+            values = np.asarray(entry["categories"])[values]
+
+        result[name] = values
+
+    return result
@@ -1,7 +1,16 @@
+import argparse
 import json
 from pathlib import Path
 
-from defi_risk_agent.simulator import load_strategy, generate_base_report
+from defi_risk_agent import instrumentation
+from defi_risk_agent.cache import ResultCache, stable_hash
+from defi_risk_agent.reports.columnar import OUTPUT_DIR, write_columnar_report
+from defi_risk_agent.simulator import (
+    generate_base_report,
+    load_strategy,
+    single_collateral_equivalent,
+)
+from defi_risk_agent.strategy import as_strategy
 from defi_risk_agent.stress.price_shocks import run_price_shocks
 from defi_risk_agent.stress.leverage_sensitivity import leverage_sensitivity
 from defi_risk_agent.stress.regime_matrix import regime_matrix
@@ -11,74 +20,174 @@ from defi_risk_agent.scoring.risk_score import compute_risk_score
 from defi_risk_agent.scoring.risk_surface import aggregate_risk_surface
 
 
+BASE_DIR = Path(__file__).resolve().parent
+OUTPUT_PATH = BASE_DIR / "latest.json"
+
+
 # =========================================================
-# Load strategy
+# Stages (Steps 0–13 + score)
+# Each stage reads the strategy and the outputs of its dependencies.
 # =========================================================
 
-strategy = load_strategy("strategy.yaml")
+def _base(strategy, results):
+    return generate_base_report(strategy)
 
 
-# =========================================================
-# Run analyses (Steps 0–12)
-# =========================================================
+def _price_shocks(strategy, results):
+    return run_price_shocks(strategy)
 
-base = generate_base_report(strategy)
-price = run_price_shocks(strategy)
-leverage = leverage_sensitivity(strategy)
-regimes = regime_matrix(strategy)
-volatility_regimes = run_volatility_regime_stress(strategy)
-scenario_matrix = run_scenario_matrix(strategy)
 
+def _leverage_sensitivity(strategy, results):
+    return leverage_sensitivity(strategy)
 
-# =========================================================
-# Step 13 — Risk surface aggregation
-# =========================================================
 
-risk_surface = aggregate_risk_surface(
-    scenario_matrix,
-    strategy["protocol"]["liquidation_threshold"]
-)
+def _regimes(strategy, results):
+    return regime_matrix(strategy)
 
 
-# =========================================================
-# Risk score (summary scalar)
-# =========================================================
+def _volatility_regimes(strategy, results):
+    return run_volatility_regime_stress(strategy)
 
-liquidation_margin = 30
-stress_survival = sum(not p["liquidated"] for p in price) / len(price)
-avg_leverage_penalty = abs(leverage[-1]["safety_buffer_pct"])
 
-risk_score = compute_risk_score(
-    liquidation_margin,
-    stress_survival,
-    avg_leverage_penalty,
-)
+def _scenario_matrix(strategy, results):
+    return run_scenario_matrix(strategy)
 
 
-# =========================================================
-# Assemble final report
-# =========================================================
+def _risk_surface(strategy, results):
+    return aggregate_risk_surface(
+        results["scenario_matrix"],
+        single_collateral_equivalent(strategy).liquidation_threshold
+    )
 
-report = {
-    "base": base,
-    "price_shocks": price,
-    "leverage_sensitivity": leverage,
-    "regimes": regimes,
-    "volatility_regimes": volatility_regimes,
-    "scenario_matrix": scenario_matrix,
-    "risk_surface": risk_surface,
-    "risk_score": risk_score
+
+def _risk_score(strategy, results):
+    price = results["price_shocks"]
+    leverage = results["leverage_sensitivity"]
+
+    liquidation_margin = results["base"]["liquidation_drop_pct"]
+    stress_survival = sum(not p["liquidated"] for p in price) / len(price)
+    avg_leverage_penalty = abs(leverage[-1]["safety_buffer_pct"])
+
+    return compute_risk_score(
+        liquidation_margin,
+        stress_survival,
+        avg_leverage_penalty,
+    )
+
+
+# name -> (dependencies, stage function); order is the report order
+STAGES = {
+    "base": ((), _base),
+    "price_shocks": ((), _price_shocks),
+    "leverage_sensitivity": ((), _leverage_sensitivity),
+    "regimes": ((), _regimes),
+    "volatility_regimes": ((), _volatility_regimes),
+    "scenario_matrix": ((), _scenario_matrix),
+    "risk_surface": (("scenario_matrix",), _risk_surface),
+    "risk_score": (("base", "price_shocks", "leverage_sensitivity"), _risk_score),
 }
 
 
-# =========================================================
-# Write output (package-relative)
-# =========================================================
+def resolve_stages(stages) -> list:
+    """
+    Requested stages plus everything they depend on,
+    in dependency order.
+    """
+    ordered = []
 
-BASE_DIR = Path(__file__).resolve().parent
-OUTPUT_PATH = BASE_DIR / "latest.json"
+    def visit(name, path=()):
+        if name not in STAGES:
+            raise ValueError(f"Unknown report stage: {name}")
+        if name in path:
+            raise ValueError(f"Cyclic stage dependency: {' -> '.join(path + (name,))}")
+        if name in ordered:
+            return
+
+        for dependency in STAGES[name][0]:
+            visit(dependency, path + (name,))
+        ordered.append(name)
+
+    for name in stages:
+        visit(name)
+
+    return ordered
 
-with open(OUTPUT_PATH, "w") as f:
-    json.dump(report, f, indent=2)
 
-print("Risk report generated.")
+# =========================================================
+# Pipeline
+# =========================================================
+
+def build_report(
+    strategy=None,
+    stages=None,
+    cache: ResultCache = None,
+) -> dict:
+    """
+    Compute the requested report stages (all by default) and only the
+    stages they depend on. Intermediate outputs are computed once and
+    shared between stages; only requested stages are returned.
+
+    With a cache, each stage is memoized on (stage, strategy): stages
+    are pure functions of the strategy, so unchanged positions are free.
+    """
+    if strategy is None:
+        strategy = load_strategy("strategy.yaml")
+    strategy = as_strategy(strategy)
+
+    requested = list(STAGES) if stages is None else list(stages)
+
+    results = {}
+    for name in resolve_stages(requested):
+        stage = STAGES[name][1]
+
+        if cache is None:
+            results[name] = stage(strategy, results)
+        else:
+            results[name] = cache.get_or_compute(
+                stable_hash("report_stage", name, strategy),
+                lambda: stage(strategy, results),
+            )
+
+    return {name: results[name] for name in STAGES if name in requested}
+
+
+def write_report(report: dict, path=OUTPUT_PATH):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the risk report")
+    parser.add_argument(
+        "--format",
+        choices=("columnar", "json"),
+        default="columnar",
+        help=f"columnar: {OUTPUT_DIR.name}/ manifest + .npy columns; "
+             f"json: legacy {OUTPUT_PATH.name}",
+    )
+    parser.add_argument("--profile", help="write a per-function timing summary (JSON)")
+    parser.add_argument("--trace", help="write a Chrome trace of the run")
+    args = parser.parse_args(argv)
+
+    if args.profile or args.trace:
+        instrumentation.enable(track_allocations=bool(args.profile))
+
+    report = build_report()
+
+    if args.format == "json":
+        write_report(report)
+    else:
+        write_columnar_report(report)
+
+    if instrumentation.is_enabled():
+        instrumentation.disable()
+        if args.profile:
+            instrumentation.write_summary(args.profile)
+        if args.trace:
+            instrumentation.write_chrome_trace(args.trace)
+
+    print("Risk report generated.")
+
+
+if __name__ == "__main__":
+    main()
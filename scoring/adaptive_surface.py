@@ -0,0 +1,188 @@
+import numpy as np
+
+from defi_risk_agent.instrumentation import instrumented
+from defi_risk_agent.scoring.risk_surface import RISK_ZONES, classify_risk_zone_codes
+from defi_risk_agent.simulator import compute_ltv, require_single_collateral
+from defi_risk_agent.strategy import as_strategy
+from defi_risk_agent.stress.scenario_matrix import (
+    BORROW_MULTIPLIERS,
+    MAX_DROP_CAP,
+    PRICE_SHOCKS,
+    VOLATILITY_REGIMES,
+)
+
+# Default coarse grid: the cells between the PRICE_SHOCKS x
+# BORROW_MULTIPLIERS points of the fixed scenario matrix
+INITIAL_CELLS = (len(PRICE_SHOCKS) - 1, len(BORROW_MULTIPLIERS) - 1)
+MAX_DEPTH = 6
+
+
+# =========================================================
+# Adaptive (quadtree) risk surface
+#
+# LTV is non-decreasing in both the price shock and the borrow
+# multiplier, so a cell whose low and high corners share a zone is
+# entirely in that zone. Only cells whose corners disagree straddle a
+# zone boundary and are split, down to max_depth.
+# =========================================================
+
+def _zone_codes(strategy, shocks, multipliers, vol_multiplier: float):
+    drop = np.minimum(shocks * vol_multiplier, MAX_DROP_CAP)
+    ltv = compute_ltv(
+        strategy.borrowed_amount * multipliers,
+        strategy.collateral_amount * strategy.collateral_price * (1 - drop),
+    )
+
+    return classify_risk_zone_codes(ltv * 100, strategy.liquidation_threshold * 100)
+
+
+@instrumented(scenarios=lambda r: r["evaluations"])
+def refine_regime(
+    strategy,
+    vol_multiplier: float,
+    price_shock_range=(PRICE_SHOCKS[0], PRICE_SHOCKS[-1]),
+    borrow_multiplier_range=(BORROW_MULTIPLIERS[0], BORROW_MULTIPLIERS[-1]),
+    initial_cells=INITIAL_CELLS,
+    max_depth: int = MAX_DEPTH,
+) -> dict:
+    """
+    Refine one volatility regime's shock x borrow plane.
+
+    Corners live on an integer lattice at the finest resolution and are
+    memoized, so a corner shared by neighbouring cells or by parent and
+    child cells is evaluated once. Cells still mixed at max_depth are
+    split between their corners' zones; their total area is reported as
+    uncertain_area_pct.
+    """
+    strategy = as_strategy(strategy)
+    require_single_collateral(strategy, "refine_regime")
+    nx, ny = initial_cells
+    scale = 2 ** max_depth
+    width, height = nx * scale, ny * scale
+
+    s_lo, s_hi = price_shock_range
+    b_lo, b_hi = borrow_multiplier_range
+
+    memo = {}
+
+    def corner_zones(i, j):
+        keys = i * (height + 1) + j
+        missing = np.unique(keys[[k not in memo for k in keys.tolist()]])
+        if len(missing):
+            mi, mj = np.divmod(missing, height + 1)
+            zones = _zone_codes(
+                strategy,
+                s_lo + (s_hi - s_lo) * mi / width,
+                b_lo + (b_hi - b_lo) * mj / height,
+                vol_multiplier,
+            )
+            memo.update(zip(missing.tolist(), zones.tolist()))
+        return np.fromiter((memo[k] for k in keys.tolist()), np.int8, len(keys))
+
+    area = np.zeros(len(RISK_ZONES))
+    uncertain = 0.0
+    boundary = []
+
+    i, j = np.meshgrid(np.arange(nx) * scale, np.arange(ny) * scale, indexing="ij")
+    i, j = i.ravel(), j.ravel()
+    size = scale
+
+    while len(i):
+        cell_area = (size / width) * (size / height)
+        corners = np.stack([
+            corner_zones(i, j),
+            corner_zones(i + size, j),
+            corner_zones(i, j + size),
+            corner_zones(i + size, j + size),
+        ])
+        uniform = corners.min(axis=0) == corners.max(axis=0)
+
+        area += np.bincount(corners[0, uniform], minlength=len(RISK_ZONES)) * cell_area
+
+        i, j, corners = i[~uniform], j[~uniform], corners[:, ~uniform]
+
+        if size == 1 or not len(i):
+            for code in range(len(RISK_ZONES)):
+                area[code] += (corners == code).sum() / 4 * cell_area
+            uncertain += len(i) * cell_area
+            boundary.append((i + 0.5, j + 0.5, corners.min(axis=0), corners.max(axis=0)))
+            break
+
+        half = size // 2
+        i = np.concatenate([i, i + half, i, i + half])
+        j = np.concatenate([j, j, j + half, j + half])
+        size = half
+
+    bi, bj, low, high = boundary[0] if boundary else ([],) * 4
+    bi, bj = np.asarray(bi, dtype=float), np.asarray(bj, dtype=float)
+    low, high = np.asarray(low), np.asarray(high)
+
+    return {
+        "zone_area_pct": {
+            zone: round(float(a) * 100, 4) for zone, a in zip(RISK_ZONES, area)
+        },
+        "uncertain_area_pct": round(uncertain * 100, 4),
+        # Midpoints of the finest mixed cells, per zone pair
+        "boundary": {
+            f"{RISK_ZONES[a]}/{RISK_ZONES[b]}": np.stack([
+                s_lo + (s_hi - s_lo) * bi[(low == a) & (high == b)] / width,
+                b_lo + (b_hi - b_lo) * bj[(low == a) & (high == b)] / height,
+            ], axis=1)
+            for a in range(len(RISK_ZONES))
+            for b in range(a + 1, len(RISK_ZONES))
+            if np.any((low == a) & (high == b))
+        },
+        "evaluations": len(memo),
+        "dense_evaluations": (width + 1) * (height + 1),
+    }
+
+
+@instrumented(scenarios=lambda r: r["evaluations"])
+def adaptive_risk_surface(
+    strategy,
+    price_shock_range=(PRICE_SHOCKS[0], PRICE_SHOCKS[-1]),
+    borrow_multiplier_range=(BORROW_MULTIPLIERS[0], BORROW_MULTIPLIERS[-1]),
+    volatility_regimes: dict = VOLATILITY_REGIMES,
+    initial_cells=INITIAL_CELLS,
+    max_depth: int = MAX_DEPTH,
+) -> dict:
+    """
+    Zone areas and boundary curves of the continuous risk surface,
+    per volatility regime. The summary weights regimes equally, like
+    the fixed scenario grid.
+
+    Corners are evaluated with one collateral price, so collateral
+    baskets are rejected.
+    """
+    require_single_collateral(strategy, "adaptive_risk_surface")
+
+    regimes = {
+        name: refine_regime(
+            strategy,
+            multiplier,
+            price_shock_range,
+            borrow_multiplier_range,
+            initial_cells,
+            max_depth,
+        )
+        for name, multiplier in volatility_regimes.items()
+    }
+
+    return {
+        "regimes": regimes,
+        "summary": {
+            "zone_area_pct": {
+                zone: round(
+                    sum(r["zone_area_pct"][zone] for r in regimes.values()) / len(regimes),
+                    4,
+                )
+                for zone in RISK_ZONES
+            },
+            "uncertain_area_pct": round(
+                sum(r["uncertain_area_pct"] for r in regimes.values()) / len(regimes),
+                4,
+            ),
+        },
+        "evaluations": sum(r["evaluations"] for r in regimes.values()),
+        "dense_evaluations": sum(r["dense_evaluations"] for r in regimes.values()),
+    }
@@ -0,0 +1,147 @@
+import numpy as np
+
+from defi_risk_agent.batch import PositionBatch, simulate_price_drop_batch
+from defi_risk_agent.instrumentation import instrumented
+from defi_risk_agent.scoring.risk_score import top_k_riskiest
+from defi_risk_agent.stress.leverage_sensitivity import BORROWED_LEVELS
+from defi_risk_agent.stress.price_shocks import PRICE_SHOCK_DROPS
+
+# Inputs each Greek is taken with respect to, mapped to PositionBatch columns
+INPUTS = {
+    "price": "price",
+    "debt": "borrowed_amount",
+    "collateral": "collateral_amount",
+    "threshold": "liquidation_threshold",
+}
+
+
+# =========================================================
+# Analytic sensitivities
+#
+#   LTV     L = D / (C P)
+#   buffer  B = T - L
+#   score   100 - max(0, 30 - m) - (1 - s) * 40 - 0.3 * |b|
+#           m = 100 * max(1 - D / (C P T), 0)   liquidation margin, %
+#           b = 100 * (T - D_lev / (C P))       buffer at D_lev, %
+#
+# D_lev is score_book's leverage_borrowed, a fixed debt level that does
+# not move with the position's own debt.
+#
+# The stress survival ratio s is a step function of the inputs, so it
+# contributes nothing to the derivatives between its jumps. The score's
+# kinks (margin at 0 and 30, score clipped at 0, b at 0) use the
+# derivative of the active branch; rounding of the report inputs is
+# ignored.
+# =========================================================
+
+@instrumented(scenarios=len)
+def compute_greeks(
+    batch: PositionBatch,
+    leverage_borrowed=BORROWED_LEVELS[-1],
+) -> dict:
+    """
+    Exact partial derivatives of LTV, liquidation buffer (both as
+    fractions) and risk score (points) with respect to collateral price,
+    borrowed amount, collateral amount and liquidation threshold, per
+    unit of each input. Every array has one entry per position.
+
+    leverage_borrowed has the same meaning as in score_book, whose
+    scores these derivatives describe.
+    """
+    P = batch.price
+    D = batch.borrowed_amount
+    C = batch.collateral_amount
+    T = batch.liquidation_threshold
+
+    value = C * P
+    ltv = D / value
+
+    d_ltv = {
+        "price": -ltv / P,
+        "debt": 1 / value,
+        "collateral": -ltv / C,
+        "threshold": np.zeros_like(ltv),
+    }
+    d_buffer = {
+        name: (np.ones_like(ltv) if name == "threshold" else -d)
+        for name, d in d_ltv.items()
+    }
+
+    # Liquidation margin m = 100 * (1 - L / T), active while 0 < m < 30
+    margin = 100 * (1 - ltv / T)
+    margin_active = (margin > 0) & (margin < 30)
+    d_margin = {
+        name: np.where(margin_active, -100 * d / T, 0.0)
+        for name, d in d_ltv.items()
+    }
+    d_margin["threshold"] = np.where(margin_active, 100 * ltv / T ** 2, 0.0)
+
+    # Leverage penalty 0.3 * |b|, b = 100 * (T - D_lev / (C P))
+    leverage_ltv = np.asarray(leverage_borrowed, dtype=float) / value
+    leverage_sign = np.sign(T - leverage_ltv)
+    d_leverage_buffer = {
+        "price": 100 * leverage_ltv / P,
+        "debt": np.zeros_like(ltv),
+        "collateral": 100 * leverage_ltv / C,
+        "threshold": np.full_like(ltv, 100.0),
+    }
+
+    # Unrounded score, only to find where the clip at 0 is active
+    liquidated = simulate_price_drop_batch(batch, PRICE_SHOCK_DROPS)["liquidated"]
+    survival = 1 - liquidated.mean(axis=1)
+    score = (
+        100
+        - np.maximum(0, 30 - np.maximum(margin, 0))
+        - (1 - survival) * 40
+        - 0.3 * np.abs(100 * (T - leverage_ltv))
+    )
+    score_active = score > 0
+
+    d_score = {
+        name: np.where(
+            score_active,
+            d_margin[name] - 0.3 * leverage_sign * d_leverage_buffer[name],
+            0.0,
+        )
+        for name in INPUTS
+    }
+
+    return {
+        "ltv": d_ltv,
+        "buffer": d_buffer,
+        "risk_score": d_score,
+    }
+
+
+# =========================================================
+# Ranking
+# =========================================================
+
+@instrumented
+def relative_greeks(batch: PositionBatch, greeks: dict) -> dict:
+    """
+    Greeks scaled to the effect of a 1% move in each input
+    (d output / d input * input / 100), comparable across positions
+    of different size.
+    """
+    return {
+        output: {
+            name: derivative * getattr(batch, INPUTS[name]) / 100
+            for name, derivative in derivatives.items()
+        }
+        for output, derivatives in greeks.items()
+    }
+
+
+@instrumented
+def rank_by_sensitivity(
+    greeks: dict,
+    output: str = "risk_score",
+    wrt: str = "price",
+    k: int = 10,
+) -> np.ndarray:
+    """
+    Indices of the k positions whose output is most sensitive to wrt
+    (largest absolute derivative first), by partial sort.
+    """
+    return top_k_riskiest(-np.abs(greeks[output][wrt]), k)
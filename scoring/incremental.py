@@ -0,0 +1,115 @@
+import numpy as np
+
+from defi_risk_agent.batch import PositionBatch
+from defi_risk_agent.instrumentation import instrumented
+from defi_risk_agent.scoring.risk_surface import RISK_ZONES
+from defi_risk_agent.simulator import compute_liquidation_price
+
+SAFE, WARNING, LIQUIDATED = range(len(RISK_ZONES))
+
+# classify_risk_zone: SAFE needs at least 10 points of LTV buffer
+SAFE_BUFFER = 0.10
+
+
+class IncrementalRiskEngine:
+    """
+    Risk zones for a position book that only reprices on market ticks.
+
+    Every position's zone is a function of the collateral price alone:
+    SAFE at or above its safe price, LIQUIDATED strictly below its
+    liquidation price, WARNING in between. Both boundary prices are
+    precomputed once and kept sorted, so a tick from p0 to p1 only
+    re-evaluates positions with a boundary between p0 and p1.
+
+    Zones use unrounded LTV (classify_risk_zone on reports uses LTV
+    rounded to 0.01%), so exact-boundary cases may differ.
+    """
+
+    @instrumented
+    def __init__(self, batch: PositionBatch, price: float = None):
+        if price is None:
+            if len(batch) and not np.all(batch.price == batch.price[0]):
+                raise ValueError(
+                    "Book has several collateral prices; pass the market price"
+                )
+            price = float(batch.price[0]) if len(batch) else 0.0
+
+        self.batch = batch
+        self.debt_ratio = batch.borrowed_amount / batch.collateral_amount
+        self.liquidation_price = compute_liquidation_price(
+            batch.collateral_amount,
+            batch.borrowed_amount,
+            batch.liquidation_threshold,
+        )
+
+        safe_threshold = batch.liquidation_threshold - SAFE_BUFFER
+        with np.errstate(divide="ignore"):
+            self.safe_price = np.where(
+                safe_threshold > 0, self.debt_ratio / safe_threshold, np.inf
+            )
+
+        boundaries = np.concatenate([self.liquidation_price, self.safe_price])
+        owners = np.concatenate([np.arange(len(batch))] * 2)
+        order = np.argsort(boundaries, kind="stable")
+        self._boundaries = boundaries[order]
+        self._owners = owners[order]
+
+        self.price = price
+        self.zones = self._zones_at(price)
+        self.zone_counts = np.bincount(self.zones, minlength=len(RISK_ZONES))
+
+    def _zones_at(self, price, index=slice(None)):
+        zones = np.full(len(self.debt_ratio[index]), WARNING, dtype=np.int8)
+        zones[price >= self.safe_price[index]] = SAFE
+        zones[price < self.liquidation_price[index]] = LIQUIDATED
+
+        return zones
+
+    @instrumented
+    def update_price(self, price: float) -> dict:
+        """
+        Move the market to price and return the positions whose risk
+        zone changed, with their previous and new zone codes
+        (indices into RISK_ZONES).
+        """
+        low, high = sorted((self.price, price))
+
+        # A boundary b flips a zone iff low < b <= high
+        start = np.searchsorted(self._boundaries, low, side="right")
+        stop = np.searchsorted(self._boundaries, high, side="right")
+        candidates = np.unique(self._owners[start:stop])
+
+        previous = self.zones[candidates]
+        current = self._zones_at(price, candidates)
+
+        moved = previous != current
+        changed = candidates[moved]
+
+        self.zones[changed] = current[moved]
+        np.subtract.at(self.zone_counts, previous[moved], 1)
+        np.add.at(self.zone_counts, current[moved], 1)
+        self.price = price
+
+        return {
+            "price": price,
+            "changed": changed,
+            "previous_zones": previous[moved],
+            "zones": current[moved],
+        }
+
+    # Price-dependent outputs, computed on demand
+
+    @instrumented
+    def ltv_pct(self, index=slice(None)):
+        return self.debt_ratio[index] / self.price * 100
+
+    @instrumented
+    def liquidation_drop_pct(self, index=slice(None)):
+        drop = 1 - self.liquidation_price[index] / self.price
+        return np.maximum(drop, 0) * 100
+
+    @instrumented
+    def zone_summary(self) -> dict:
+        return {
+            zone: int(count) for zone, count in zip(RISK_ZONES, self.zone_counts)
+        }
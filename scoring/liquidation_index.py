@@ -0,0 +1,286 @@
+import math
+from bisect import bisect_left, bisect_right
+from itertools import count
+
+import numpy as np
+
+from defi_risk_agent.batch import PositionBatch
+from defi_risk_agent.instrumentation import instrumented
+from defi_risk_agent.simulator import compute_liquidation_price
+
+# Target number of positions per block; a block is split at twice this
+BLOCK_LOAD = 256
+
+
+class LiquidationIndex:
+    """
+    Position book ordered by liquidation price.
+
+    A position is liquidated at collateral price P when its liquidation
+    price is strictly above P, so "who is liquidated at P" is a suffix
+    of the ordering found by binary search.
+
+    The ordering is kept in sorted blocks of about BLOCK_LOAD positions.
+    Per-block counts, debt and collateral sit in Fenwick trees, so an
+    insert, update or removal costs O(log n + BLOCK_LOAD) and count and
+    debt queries cost the same; membership queries are O(log n + k).
+    """
+
+    def __init__(self):
+        # Parallel lists of blocks, each sorted by
+        # (liquidation price, insertion sequence)
+        self._blocks = []
+        self._keys = []
+        self._debt = []
+        self._collateral = []
+        # Last entry of every block, for locating blocks by bisection
+        self._maxes = []
+
+        self._positions = {}
+        self._sequence = count()
+        self._count_sums = _SuffixTree([])
+        self._debt_sums = _SuffixTree([])
+        self._collateral_sums = _SuffixTree([])
+
+    @classmethod
+    @instrumented
+    def from_batch(cls, batch: PositionBatch, keys=None) -> "LiquidationIndex":
+        """
+        Bulk-build from a PositionBatch; keys default to row numbers.
+        """
+        index = cls()
+        keys = list(range(len(batch))) if keys is None else list(keys)
+
+        prices = compute_liquidation_price(
+            batch.collateral_amount, batch.borrowed_amount, batch.liquidation_threshold
+        )
+        order = np.argsort(prices, kind="stable").tolist()
+
+        entries = [(float(prices[i]), next(index._sequence)) for i in order]
+        ordered_keys = [keys[i] for i in order]
+        debt = batch.borrowed_amount[order].tolist()
+        collateral = batch.collateral_amount[order].tolist()
+
+        for start in range(0, len(entries), BLOCK_LOAD):
+            block = slice(start, start + BLOCK_LOAD)
+            index._blocks.append(entries[block])
+            index._keys.append(ordered_keys[block])
+            index._debt.append(debt[block])
+            index._collateral.append(collateral[block])
+            index._maxes.append(entries[block][-1])
+
+        index._positions = dict(zip(ordered_keys, entries))
+        if len(index._positions) != len(entries):
+            raise ValueError("Duplicate position keys")
+
+        index._rebuild_sums()
+        return index
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key) -> bool:
+        return key in self._positions
+
+    # Mutations
+
+    @instrumented
+    def insert(
+        self,
+        key,
+        collateral_amount: float,
+        borrowed_amount: float,
+        liquidation_threshold: float,
+    ):
+        if key in self._positions:
+            raise KeyError(f"Position {key!r} already indexed; use update()")
+
+        entry = (
+            float(compute_liquidation_price(
+                collateral_amount, borrowed_amount, liquidation_threshold
+            )),
+            next(self._sequence),
+        )
+        self._positions[key] = entry
+
+        if not self._blocks:
+            self._blocks.append([entry])
+            self._keys.append([key])
+            self._debt.append([borrowed_amount])
+            self._collateral.append([collateral_amount])
+            self._maxes.append(entry)
+            self._rebuild_sums()
+            return
+
+        b = min(bisect_left(self._maxes, entry), len(self._blocks) - 1)
+        block = self._blocks[b]
+        i = bisect_left(block, entry)
+
+        block.insert(i, entry)
+        self._keys[b].insert(i, key)
+        self._debt[b].insert(i, borrowed_amount)
+        self._collateral[b].insert(i, collateral_amount)
+        self._maxes[b] = block[-1]
+
+        if len(block) > 2 * BLOCK_LOAD:
+            self._split(b)
+        else:
+            self._add_to_sums(b, 1, borrowed_amount, collateral_amount)
+
+    @instrumented
+    def remove(self, key):
+        entry = self._positions.pop(key)
+        b = bisect_left(self._maxes, entry)
+        block = self._blocks[b]
+        i = bisect_left(block, entry)
+
+        del block[i]
+        del self._keys[b][i]
+        debt = self._debt[b].pop(i)
+        collateral = self._collateral[b].pop(i)
+
+        if block:
+            self._maxes[b] = block[-1]
+            self._add_to_sums(b, -1, -debt, -collateral)
+        else:
+            for blocks in (
+                self._blocks, self._keys, self._debt, self._collateral, self._maxes
+            ):
+                del blocks[b]
+            self._rebuild_sums()
+
+    @instrumented
+    def update(
+        self,
+        key,
+        collateral_amount: float,
+        borrowed_amount: float,
+        liquidation_threshold: float,
+    ):
+        self.remove(key)
+        self.insert(key, collateral_amount, borrowed_amount, liquidation_threshold)
+
+    def liquidation_price(self, key) -> float:
+        return self._positions[key][0]
+
+    # Queries
+
+    def _first_liquidated(self, price: float) -> tuple:
+        # (block, offset) of the first entry whose liquidation price is
+        # strictly above price; (len(blocks), 0) if there is none
+        target = (price, math.inf)
+        b = bisect_right(self._maxes, target)
+        if b == len(self._blocks):
+            return b, 0
+        return b, bisect_right(self._blocks[b], target)
+
+    def _keys_between(self, start: tuple, stop: tuple) -> list:
+        (b0, i0), (b1, i1) = start, stop
+        if b0 == b1:
+            return self._keys[b0][i0:i1] if b0 < len(self._keys) else []
+
+        keys = self._keys[b0][i0:]
+        for b in range(b0 + 1, b1):
+            keys.extend(self._keys[b])
+        if b1 < len(self._keys):
+            keys.extend(self._keys[b1][:i1])
+        return keys
+
+    def _suffix(self, values: list, sums: "_SuffixTree", price: float) -> float:
+        b, i = self._first_liquidated(price)
+        if b == len(values):
+            return 0.0
+        return sum(values[b][i:]) + sums.suffix(b + 1)
+
+    @instrumented
+    def count_liquidated(self, price: float) -> int:
+        b, i = self._first_liquidated(price)
+        if b == len(self._blocks):
+            return 0
+        return len(self._blocks[b]) - i + int(self._count_sums.suffix(b + 1))
+
+    @instrumented
+    def liquidated_at(self, price: float) -> list:
+        """
+        Keys of positions liquidated at collateral price `price`,
+        ordered from the most to the least resilient.
+        """
+        return self._keys_between(self._first_liquidated(price), (len(self._keys), 0))
+
+    @instrumented
+    def liquidated_between(self, high: float, low: float) -> list:
+        """
+        Keys newly liquidated when price falls from high to low.
+        """
+        return self._keys_between(self._first_liquidated(low), self._first_liquidated(high))
+
+    @instrumented
+    def liquidated_debt_at(self, price: float) -> float:
+        return float(self._suffix(self._debt, self._debt_sums, price))
+
+    @instrumented
+    def liquidated_collateral_at(self, price: float) -> float:
+        return float(self._suffix(self._collateral, self._collateral_sums, price))
+
+    @instrumented
+    def liquidated_debt_curve(self, reference_price: float, drops) -> np.ndarray:
+        """
+        Cumulative liquidated debt for each fractional price drop
+        from reference_price.
+        """
+        prices = reference_price * (1 - np.asarray(drops, dtype=float))
+
+        return np.array(
+            [self._suffix(self._debt, self._debt_sums, p) for p in prices.ravel().tolist()],
+            dtype=float,
+        ).reshape(prices.shape)
+
+    # Blocks and block sums
+
+    def _split(self, b: int):
+        for blocks in (self._blocks, self._keys, self._debt, self._collateral):
+            blocks[b:b + 1] = [blocks[b][:BLOCK_LOAD], blocks[b][BLOCK_LOAD:]]
+        self._maxes[b:b + 1] = [self._blocks[b][-1], self._blocks[b + 1][-1]]
+        self._rebuild_sums()
+
+    def _add_to_sums(self, b: int, n: int, debt: float, collateral: float):
+        self._count_sums.add(b, n)
+        self._debt_sums.add(b, debt)
+        self._collateral_sums.add(b, collateral)
+
+    def _rebuild_sums(self):
+        # Rebuilt from the blocks whenever the block layout changes, which
+        # also discards rounding drift from incremental updates
+        self._count_sums = _SuffixTree([len(block) for block in self._blocks])
+        self._debt_sums = _SuffixTree([sum(block) for block in self._debt])
+        self._collateral_sums = _SuffixTree([sum(block) for block in self._collateral])
+
+
+class _SuffixTree:
+    """
+    Fenwick tree answering suffix sums values[i:] in O(log n). Indexed
+    from the end, so suffixes are summed directly rather than as a
+    total minus a prefix.
+    """
+
+    def __init__(self, values: list):
+        n = len(values)
+        self._tree = [0.0] + values[::-1]
+        for j in range(1, n + 1):
+            parent = j + (j & -j)
+            if parent <= n:
+                self._tree[parent] += self._tree[j]
+
+    def add(self, i: int, delta: float):
+        j = len(self._tree) - 1 - i
+        while j < len(self._tree):
+            self._tree[j] += delta
+            j += j & -j
+
+    def suffix(self, i: int) -> float:
+        j = len(self._tree) - 1 - i
+        total = 0.0
+        while j > 0:
+            total += self._tree[j]
+            j -= j & -j
+        return total
@@ -1,3 +1,17 @@
+import numpy as np
+
+from defi_risk_agent.batch import (
+    PositionBatch,
+    simulate_price_drop_batch,
+    solve_liquidation_batch,
+)
+from defi_risk_agent.instrumentation import instrumented
+from defi_risk_agent.simulator import compute_ltv
+from defi_risk_agent.stress.leverage_sensitivity import BORROWED_LEVELS
+from defi_risk_agent.stress.price_shocks import PRICE_SHOCK_DROPS
+
+
+@instrumented
 def compute_risk_score(
     liquidation_margin_pct: float,
     stress_survival_ratio: float,
@@ -10,3 +24,115 @@ def compute_risk_score(
     score -= leverage_sensitivity_pct * 0.3
 
     return round(max(score, 0), 2)
+
+
+# =========================================================
+# Array-native scoring over a position book
+# =========================================================
+
+@instrumented
+def compute_risk_score_array(
+    liquidation_margin_pct,
+    stress_survival_ratio,
+    leverage_sensitivity_pct,
+):
+    """
+    Vectorized compute_risk_score (np.round, so exact halfway values
+    may differ from round() by 0.01).
+    """
+    score = (
+        100
+        - np.maximum(0, 30 - np.asarray(liquidation_margin_pct, dtype=float))
+        - (1 - np.asarray(stress_survival_ratio, dtype=float)) * 40
+        - np.asarray(leverage_sensitivity_pct, dtype=float) * 0.3
+    )
+
+    return np.round(np.maximum(score, 0), 2)
+
+
+@instrumented(scenarios=lambda r: len(r["risk_score"]) * len(PRICE_SHOCK_DROPS))
+def score_book(
+    batch: PositionBatch,
+    leverage_borrowed=BORROWED_LEVELS[-1],
+) -> dict:
+    """
+    Risk score inputs and scores for every position, derived the same
+    way as the report's risk_score stage:
+    - liquidation margin: base report liquidation_drop_pct
+    - stress survival: share of run_price_shocks drops not liquidated
+    - leverage penalty: |safety buffer| at leverage_borrowed debt, by
+      default the last leverage_sensitivity level (a scalar, or one
+      amount per position)
+    """
+    liquidation = solve_liquidation_batch(batch)
+    margin = np.round(np.maximum(liquidation["critical_drop"], 0) * 100, 2)
+
+    survival = 1 - simulate_price_drop_batch(batch, PRICE_SHOCK_DROPS)["liquidated"].mean(axis=1)
+
+    buffer = batch.liquidation_threshold - compute_ltv(
+        np.asarray(leverage_borrowed, dtype=float), batch.collateral_value()
+    )
+    leverage_penalty = np.abs(np.round(buffer * 100, 2))
+
+    return {
+        "liquidation_margin_pct": margin,
+        "stress_survival_ratio": survival,
+        "leverage_sensitivity_pct": leverage_penalty,
+        "risk_score": compute_risk_score_array(margin, survival, leverage_penalty),
+    }
+
+
+# =========================================================
+# Ranking
+# Lower scores are riskier.
+# =========================================================
+
+@instrumented
+def top_k_riskiest(scores, k: int) -> np.ndarray:
+    """
+    Indices of the k lowest scores, riskiest first. Uses a partial
+    sort (O(n + k log k)) instead of sorting the whole book.
+    """
+    scores = np.asarray(scores)
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+
+    candidates = np.argpartition(scores, k - 1)[:k]
+    return candidates[np.argsort(scores[candidates], kind="stable")]
+
+
+@instrumented
+def score_histogram(scores, bins: int = 10) -> dict:
+    counts, edges = np.histogram(scores, bins=bins, range=(0, 100))
+
+    return {"edges": edges.tolist(), "counts": counts.tolist()}
+
+
+@instrumented
+def score_percentiles_by_protocol(
+    scores,
+    protocol,
+    percentiles=(5, 25, 50, 75, 95),
+) -> dict:
+    """
+    Score percentiles per protocol, from one sort of the whole book.
+    """
+    scores = np.asarray(scores, dtype=float)
+    names, codes = np.unique(np.asarray(protocol), return_inverse=True)
+
+    order = np.lexsort((scores, codes))
+    bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+
+    result = {}
+    for code, name in enumerate(names.tolist()):
+        group = scores[order[bounds[code]:bounds[code + 1]]]
+        result[name] = {
+            "positions": len(group),
+            **{
+                f"p{q}": round(float(value), 2)
+                for q, value in zip(percentiles, np.percentile(group, percentiles))
+            },
+        }
+
+    return result
@@ -1,3 +1,10 @@
+import numpy as np
+
+from defi_risk_agent.instrumentation import instrumented
+
+RISK_ZONES = ("SAFE", "WARNING", "LIQUIDATED")
+
+
 def classify_risk_zone(ltv_pct: float, liquidation_threshold_pct: float) -> str:
     """
     Classify a scenario into SAFE / WARNING / LIQUIDATED
@@ -13,43 +20,173 @@ def classify_risk_zone(ltv_pct: float, liquidation_threshold_pct: float) -> str:
         return "LIQUIDATED"
 
 
-def aggregate_risk_surface(
-    scenario_matrix: list,
-    liquidation_threshold: float
-) -> dict:
+@instrumented(scenarios=np.size)
+def classify_risk_zone_codes(ltv_pct, liquidation_threshold_pct):
     """
-    Enrich scenario matrix with risk zones and aggregate statistics.
+    Vectorized classify_risk_zone.
+    Returns int8 codes indexing RISK_ZONES, broadcast over the inputs.
     """
-    threshold_pct = liquidation_threshold * 100
+    buffer = np.asarray(liquidation_threshold_pct) - np.asarray(ltv_pct)
 
-    enriched = []
-    zone_counts = {"SAFE": 0, "WARNING": 0, "LIQUIDATED": 0}
+    return np.where(buffer >= 10, 0, np.where(buffer >= 0, 1, 2)).astype(np.int8)
 
-    for row in scenario_matrix:
-        zone = classify_risk_zone(row["ltv_pct"], threshold_pct)
 
-        enriched_row = {
-            **row,
-            "risk_zone": zone
-        }
+class RiskSurfaceAccumulator:
+    """
+    Incremental risk surface aggregation over blocks of scenarios.
+
+    Keeps zone counts and, if quantiles are requested, a count per
+    distinct LTV value (ltv_pct is rounded to 0.01, so this is bounded
+    by the LTV range, not by the number of scenarios). The enriched
+    matrix is only retained when keep_enriched is set.
+
+    Scenarios that carry their own liquidation threshold (collateral
+    basket grids) are classified against it instead of
+    liquidation_threshold.
+    """
+
+    def __init__(
+        self,
+        liquidation_threshold: float,
+        keep_enriched: bool = False,
+        quantiles=None,
+    ):
+        self.threshold_pct = liquidation_threshold * 100
+        self.quantiles = quantiles
+        self.zone_counts = {zone: 0 for zone in RISK_ZONES}
+        self.enriched = [] if keep_enriched else None
+        self._ltv_counts = {}
+
+    @instrumented
+    def add_rows(self, rows):
+        """
+        Add scenarios in run_scenario_matrix row format.
+        """
+        rows = list(rows)
+
+        for row in rows:
+            zone = classify_risk_zone(
+                row["ltv_pct"], row.get("liquidation_threshold_pct", self.threshold_pct)
+            )
+            self.zone_counts[zone] += 1
+
+            if self.enriched is not None:
+                self.enriched.append({**row, "risk_zone": zone})
+
+        if self.quantiles is not None:
+            self._add_ltv_pct(
+                np.fromiter((row["ltv_pct"] for row in rows), dtype=float)
+            )
+
+    @instrumented
+    def add_grid(self, grid: dict):
+        """
+        Add a columnar block from run_scenario_grid / iter_scenario_grid.
+        """
+        if self.enriched is not None:
+            from defi_risk_agent.stress.scenario_matrix import (
+                materialize_scenario_rows,
+            )
+            self.add_rows(materialize_scenario_rows(grid))
+            return
+
+        ltv_pct = np.round(grid["ltv"] * 100, 2)
+        threshold_pct = self.threshold_pct
+        if "liquidation_threshold" in grid:
+            # (S, R) -> (S, 1, R), as rounded in the materialized rows
+            threshold_pct = np.round(grid["liquidation_threshold"] * 100, 2)[:, None, :]
+        codes = classify_risk_zone_codes(ltv_pct, threshold_pct)
+        counts = np.bincount(codes.ravel(), minlength=len(RISK_ZONES))
+
+        for zone, count in zip(RISK_ZONES, counts.tolist()):
+            self.zone_counts[zone] += count
 
-        enriched.append(enriched_row)
-        zone_counts[zone] += 1
+        if self.quantiles is not None:
+            self._add_ltv_pct(ltv_pct.ravel())
 
-    total = len(enriched)
+    def _add_ltv_pct(self, ltv_pct):
+        values, counts = np.unique(
+            np.rint(ltv_pct * 100).astype(np.int64), return_counts=True
+        )
+        for value, count in zip(values.tolist(), counts.tolist()):
+            self._ltv_counts[value] = self._ltv_counts.get(value, 0) + count
 
-    summary = {
-        "total_scenarios": total,
-        "zone_distribution": {
-            k: {
-                "count": v,
-                "pct": round(v / total * 100, 2)
+    @instrumented
+    def ltv_quantiles(self) -> dict:
+        """
+        Exact (inverted CDF) quantiles of ltv_pct over all added scenarios.
+        """
+        values = sorted(self._ltv_counts)
+        cumulative = np.cumsum([self._ltv_counts[v] for v in values])
+        total = int(cumulative[-1])
+
+        result = {}
+        for q in self.quantiles:
+            rank = max(1, int(np.ceil(q * total)))
+            index = int(np.searchsorted(cumulative, rank))
+            result[q] = values[index] / 100
+
+        return result
+
+    @instrumented
+    def result(self) -> dict:
+        total = sum(self.zone_counts.values())
+
+        summary = {
+            "total_scenarios": total,
+            "zone_distribution": {
+                k: {
+                    "count": v,
+                    "pct": round(v / total * 100, 2)
+                }
+                for k, v in self.zone_counts.items()
             }
-            for k, v in zone_counts.items()
         }
-    }
 
-    return {
-        "enriched_matrix": enriched,
-        "summary": summary
-    }
+        output = {}
+        if self.enriched is not None:
+            output["enriched_matrix"] = self.enriched
+        output["summary"] = summary
+        if self.quantiles is not None:
+            output["ltv_quantiles"] = self.ltv_quantiles()
+
+        return output
+
+
+@instrumented(scenarios=lambda r: r["summary"]["total_scenarios"])
+def aggregate_risk_surface(
+    scenario_matrix: list,
+    liquidation_threshold: float,
+    keep_enriched: bool = True,
+) -> dict:
+    """
+    Enrich scenario matrix with risk zones and aggregate statistics.
+    """
+    accumulator = RiskSurfaceAccumulator(liquidation_threshold, keep_enriched)
+    accumulator.add_rows(scenario_matrix)
+
+    return accumulator.result()
+
+
+@instrumented(scenarios=lambda r: r["summary"]["total_scenarios"])
+def aggregate_risk_surface_stream(
+    blocks,
+    liquidation_threshold: float,
+    keep_enriched: bool = False,
+    quantiles=None,
+) -> dict:
+    """
+    Aggregate a stream of scenario blocks (columnar grids or lists of
+    rows) without holding more than one block in memory.
+    """
+    accumulator = RiskSurfaceAccumulator(
+        liquidation_threshold, keep_enriched, quantiles
+    )
+
+    for block in blocks:
+        if isinstance(block, dict):
+            accumulator.add_grid(block)
+        else:
+            accumulator.add_rows(block)
+
+    return accumulator.result()
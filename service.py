@@ -0,0 +1,397 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from defi_risk_agent.batch import (
+    PositionBatch,
+    generate_base_report_batch,
+    generate_risk_report_batch,
+    risk_report_rows,
+    solve_liquidation_batch,
+)
+from defi_risk_agent.cache import ResultCache, cached_risk_surface
+from defi_risk_agent.microbatch import MicroBatcher
+from defi_risk_agent.scoring.risk_score import score_book
+from defi_risk_agent.stress.scenario_matrix import (
+    BORROW_MULTIPLIERS,
+    PRICE_SHOCKS,
+    VOLATILITY_REGIMES,
+)
+
+# =========================================================
+# Long-running risk service (HTTP over TCP or a Unix socket)
+#
+#   POST /score       {"positions": [strategy, ...]}
+#   POST /risk        {"position": strategy}  (micro-batched)
+#   POST /risk_score  {"position": strategy}  (micro-batched)
+#   POST /sweep       {"strategy": strategy, "price_shocks": [...], ...}
+#   GET  /metrics     request counts and latency percentiles
+#   GET  /health
+# =========================================================
+
+LATENCY_WINDOW = 10_000
+LATENCY_PERCENTILES = (50, 90, 99)
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+# =========================================================
+# Worker-side handlers (run in the process pool)
+# =========================================================
+
+_WORKER_CACHE = None
+
+
+def _init_worker(cache_entries: int):
+    global _WORKER_CACHE
+    _WORKER_CACHE = ResultCache(max_entries=cache_entries)
+
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {k: _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    return value
+
+
+def score_positions(positions: list) -> dict:
+    """
+    Base risk columns for a batch of single-collateral positions.
+    """
+    batch = PositionBatch.from_strategies(positions)
+    report = generate_base_report_batch(batch)
+    report["max_borrow"] = solve_liquidation_batch(batch)["critical_borrow"]
+
+    return _to_json(report)
+
+
+def risk_reports(positions: list) -> list:
+    """
+    generate_risk_report for every position, evaluated as one batch.
+    """
+    return risk_report_rows(
+        generate_risk_report_batch(PositionBatch.from_strategies(positions))
+    )
+
+
+def risk_scores(positions: list) -> list:
+    """
+    compute_risk_score inputs and score for every position, evaluated
+    as one batch by score_book.
+    """
+    columns = score_book(PositionBatch.from_strategies(positions))
+    names = list(columns)
+
+    return [
+        dict(zip(names, values))
+        for values in zip(*(columns[name].tolist() for name in names))
+    ]
+
+
+def sweep_strategy(request: dict) -> dict:
+    """
+    Risk surface summary over a scenario grid, memoized per worker.
+    """
+    surface = cached_risk_surface(
+        request["strategy"],
+        _WORKER_CACHE,
+        False,
+        request.get("price_shocks", PRICE_SHOCKS),
+        request.get("borrow_multipliers", BORROW_MULTIPLIERS),
+        request.get("volatility_regimes", VOLATILITY_REGIMES),
+    )
+
+    return _to_json(surface)
+
+
+# =========================================================
+# Latency tracking
+# =========================================================
+
+class LatencyRecorder:
+    """
+    Request counts and latency percentiles per endpoint over the last
+    `window` requests.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples = {}
+        self._counts = {}
+        self._errors = {}
+
+    def record(self, endpoint: str, seconds: float, ok: bool = True):
+        self._samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+        self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+        if not ok:
+            self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+
+    def summary(self) -> dict:
+        result = {}
+
+        for endpoint, samples in self._samples.items():
+            latency_ms = np.asarray(samples) * 1000
+            entry = {
+                "requests": self._counts[endpoint],
+                "errors": self._errors.get(endpoint, 0),
+                "mean_ms": round(float(latency_ms.mean()), 3),
+                "max_ms": round(float(latency_ms.max()), 3),
+            }
+            for q, value in zip(
+                LATENCY_PERCENTILES,
+                np.percentile(latency_ms, LATENCY_PERCENTILES),
+            ):
+                entry[f"p{q}_ms"] = round(float(value), 3)
+
+            result[endpoint] = entry
+
+        return result
+
+
+# =========================================================
+# Service
+# =========================================================
+
+class RiskService:
+    """
+    Keeps the engine warm in a process pool and serves JSON over a
+    minimal HTTP/1.1 server (keep-alive supported). CPU work never runs
+    on the event loop.
+    """
+
+    def __init__(
+        self,
+        workers: int = None,
+        cache_entries: int = 1024,
+        max_batch_size: int = 256,
+        max_wait: float = 0.002,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(cache_entries,),
+        )
+        self.latency = LatencyRecorder()
+        self.batcher = MicroBatcher(
+            partial(self.run_in_pool, risk_reports), max_batch_size, max_wait
+        )
+        self.score_batcher = MicroBatcher(
+            partial(self.run_in_pool, risk_scores), max_batch_size, max_wait
+        )
+        self.started = time.time()
+        self.routes = {
+            ("POST", "/score"): self.score,
+            ("POST", "/risk"): self.risk,
+            ("POST", "/risk_score"): self.risk_score,
+            ("POST", "/sweep"): self.sweep,
+            ("GET", "/metrics"): self.metrics,
+            ("GET", "/health"): self.health,
+        }
+
+    async def run_in_pool(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args))
+
+    # Endpoints
+
+    async def score(self, body: dict) -> dict:
+        if not body.get("positions"):
+            raise ValueError("'positions' must be a non-empty list")
+        return await self.run_in_pool(score_positions, body["positions"])
+
+    async def risk(self, body: dict) -> dict:
+        if "position" not in body:
+            raise ValueError("'position' is required")
+        if not isinstance(body["position"], dict):
+            raise TypeError("'position' must be a JSON object")
+        return await self.batcher.submit(body["position"])
+
+    async def risk_score(self, body: dict) -> dict:
+        if "position" not in body:
+            raise ValueError("'position' is required")
+        if not isinstance(body["position"], dict):
+            raise TypeError("'position' must be a JSON object")
+        return await self.score_batcher.submit(body["position"])
+
+    async def sweep(self, body: dict) -> dict:
+        if "strategy" not in body:
+            raise ValueError("'strategy' is required")
+        return await self.run_in_pool(sweep_strategy, body)
+
+    async def metrics(self, body: dict) -> dict:
+        return {
+            "uptime_s": round(time.time() - self.started, 3),
+            "endpoints": self.latency.summary(),
+            "risk_batching": self.batcher.stats(),
+            "score_batching": self.score_batcher.stats(),
+        }
+
+    async def health(self, body: dict) -> dict:
+        return {"status": "ok"}
+
+    # HTTP plumbing
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ValueError as e:
+                    # Malformed request line or headers: answer, then drop
+                    # the connection, since the framing can't be trusted
+                    _write_response(writer, 400, {"error": str(e)}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                status, payload = await self.dispatch(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, path: str, body: bytes):
+        start = time.perf_counter()
+        route = path.split("?", 1)[0]
+        handler = self.routes.get((method, route))
+
+        if handler is None:
+            return 404, {"error": f"No route for {method} {path}"}
+
+        try:
+            request = json.loads(body) if body else {}
+            if not isinstance(request, dict):
+                raise TypeError("Request body must be a JSON object")
+            status, payload = 200, await handler(request)
+        except (ValueError, KeyError, TypeError) as e:
+            status, payload = 400, {"error": f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+
+        self.latency.record(route, time.perf_counter() - start, ok=status == 200)
+        return status, payload
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8787, unix_path: str = None):
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_connection, unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+
+        # Import and fork the workers before the first request arrives
+        await asyncio.gather(*(
+            self.run_in_pool(_to_json, None)
+            for _ in range(self.workers)
+        ))
+
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+async def _read_request(reader):
+    """
+    Parse one HTTP/1.1 request; None when the client closed the connection.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise ValueError(f"Malformed request line: {line[:80]!r}")
+    method, path, _ = parts
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise ValueError("Malformed Content-Length header") from None
+    if length < 0:
+        raise ValueError("Malformed Content-Length header")
+    if length > MAX_BODY_BYTES:
+        raise ConnectionError("Request body too large")
+    body = await reader.readexactly(length) if length else b""
+
+    return method, path, headers, body
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+def _write_response(writer, status: int, payload: dict, keep_alive: bool):
+    body = json.dumps(payload).encode()
+    writer.write(
+        (
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n"
+        ).encode("latin-1")
+        + body
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve risk scoring over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    parser.add_argument("--cache-entries", type=int, default=1024)
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument(
+        "--max-wait-ms", type=float, default=2.0,
+        help="how long /risk and /risk_score wait to coalesce concurrent requests",
+    )
+    args = parser.parse_args(argv)
+
+    service = RiskService(
+        args.workers,
+        args.cache_entries,
+        args.max_batch_size,
+        args.max_wait_ms / 1000,
+    )
+    target = args.unix or f"http://{args.host}:{args.port}"
+    print(f"Risk service listening on {target}")
+
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,25 @@
-import yaml
+from pathlib import Path
 from typing import Dict
 
+from defi_risk_agent.strategy import Strategy, as_strategy
+
 # =========================================================
 # Load strategy configuration
 # =========================================================
 
-from pathlib import Path
-import yaml
-
-def load_strategy(path: str) -> dict:
+def load_strategy(path: str) -> Strategy:
     """
     Load strategy YAML relative to the package root.
     This works regardless of the working directory.
     """
+    # Only strategy loading needs yaml; keep it off the import path
+    import yaml
+
     base_dir = Path(__file__).resolve().parent
     strategy_path = base_dir / path
 
     with open(strategy_path, "r") as f:
-        return yaml.safe_load(f)
+        return Strategy(yaml.safe_load(f))
 
 
 # =========================================================
@@ -31,6 +33,40 @@ def compute_ltv(borrowed: float, collateral_value: float) -> float:
     return borrowed / collateral_value
 
 
+# =========================================================
+# Closed-form liquidation point (scalar or NumPy arrays)
+# =========================================================
+
+def compute_liquidation_price(
+    collateral_amount: float,
+    borrowed: float,
+    liquidation_threshold: float,
+) -> float:
+    """
+    Collateral price below which LTV exceeds the liquidation threshold.
+    """
+    return borrowed / (collateral_amount * liquidation_threshold)
+
+
+def compute_liquidation_drop(price: float, liquidation_price: float) -> float:
+    """
+    Fractional price drop at which liquidation begins.
+    Negative when the position is already liquidated.
+    """
+    return 1 - liquidation_price / price
+
+
+def compute_max_borrow(
+    collateral_amount: float,
+    price: float,
+    liquidation_threshold: float,
+) -> float:
+    """
+    Largest borrowed amount that is not liquidated at the given price.
+    """
+    return collateral_amount * price * liquidation_threshold
+
+
 def simulate_price_drop(
     collateral_amount: float,
     price: float,
@@ -53,6 +89,111 @@ def simulate_price_drop(
     }
 
 
+# =========================================================
+# Multi-asset collateral
+# =========================================================
+
+def is_multi_asset(strategy: dict) -> bool:
+    return "collateral" in strategy["position"]
+
+
+def require_single_collateral(strategy: dict, operation: str):
+    """
+    Reject collateral baskets in operations that model one collateral
+    price and cannot honour market.covariance.
+    """
+    if is_multi_asset(strategy):
+        raise ValueError(
+            f"{operation} supports single-collateral strategies only; "
+            "evaluate collateral baskets with run_scenario_grid"
+        )
+
+
+def collateral_basket(strategy: dict) -> list:
+    """
+    Collateral legs as (asset, amount, price, liquidation_threshold).
+
+    Multi-asset schema:
+      position.collateral: [{asset, amount}, ...]
+      market.prices: {asset: price}
+      protocol.asset_thresholds: {asset: threshold}  (optional, falls
+      back to protocol.liquidation_threshold)
+
+    Single-collateral strategies become a one-leg basket.
+    """
+    position = strategy["position"]
+    market = strategy["market"]
+    protocol = strategy["protocol"]
+
+    if not is_multi_asset(strategy):
+        return [(
+            market.get("asset", "collateral"),
+            position["collateral_amount"],
+            market["collateral_price"],
+            protocol["liquidation_threshold"],
+        )]
+
+    thresholds = protocol.get("asset_thresholds", {})
+
+    return [
+        (
+            leg["asset"],
+            leg["amount"],
+            market["prices"][leg["asset"]],
+            thresholds.get(leg["asset"], protocol.get("liquidation_threshold")),
+        )
+        for leg in position["collateral"]
+    ]
+
+
+def weighted_liquidation_threshold(basket: list) -> float:
+    """
+    Value-weighted liquidation threshold of a collateral basket:
+    the position is liquidated when debt exceeds
+    sum(amount * price * threshold) over all legs.
+    """
+    values = [amount * price for _, amount, price, _ in basket]
+    weighted = sum(
+        value * threshold
+        for value, (_, _, _, threshold) in zip(values, basket)
+    )
+
+    return weighted / sum(values)
+
+
+def single_collateral_equivalent(strategy: dict) -> Strategy:
+    """
+    Single-collateral strategy that behaves like strategy's collateral
+    basket when every asset falls by the same fraction: one unit of
+    collateral priced at the basket value, with the value-weighted
+    liquidation threshold. Stressed "prices" of the equivalent are
+    stressed basket values.
+
+    Single-collateral strategies are returned unchanged.
+    """
+    strategy = as_strategy(strategy)
+    if not is_multi_asset(strategy):
+        return strategy
+
+    basket = collateral_basket(strategy)
+
+    return (
+        strategy
+        .with_section("position", {
+            "collateral_amount": 1.0,
+            "borrowed_amount": strategy["position"]["borrowed_amount"],
+        })
+        .override(
+            "market",
+            collateral_price=sum(amount * price for _, amount, price, _ in basket),
+        )
+        .override(
+            "protocol",
+            liquidation_threshold=weighted_liquidation_threshold(basket),
+        )
+    )
+
+
 # =========================================================
 # Base (static) risk snapshot — REQUIRED BY REPORT LAYER
 # =========================================================
@@ -62,6 +203,9 @@ def generate_base_report(strategy: dict) -> Dict:
     Generate a static snapshot of the position without stress.
     Used by reporting and higher-level scenario engines.
     """
+    if is_multi_asset(strategy):
+        return _generate_multi_asset_base_report(strategy)
+
     position = strategy["position"]
     market = strategy["market"]
     protocol = strategy["protocol"]
@@ -69,12 +213,45 @@ def generate_base_report(strategy: dict) -> Dict:
     collateral_value = position["collateral_amount"] * market["collateral_price"]
     ltv = compute_ltv(position["borrowed_amount"], collateral_value)
 
+    liquidation_price = compute_liquidation_price(
+        position["collateral_amount"],
+        position["borrowed_amount"],
+        protocol["liquidation_threshold"],
+    )
+    liquidation_drop = compute_liquidation_drop(
+        market["collateral_price"], liquidation_price
+    )
+
     return {
         "protocol": protocol["name"],
         "current_ltv_pct": round(ltv * 100, 2),
         "liquidation_threshold_pct": round(
             protocol["liquidation_threshold"] * 100, 2
         ),
+        "liquidation_price": round(liquidation_price, 2),
+        "liquidation_drop_pct": round(max(liquidation_drop, 0) * 100, 2),
+    }
+
+
+def _generate_multi_asset_base_report(strategy: dict) -> Dict:
+    """
+    Base report for a collateral basket. The liquidation drop assumes
+    every asset falls by the same fraction (weights are then unchanged);
+    there is no single liquidation price.
+    """
+    basket = collateral_basket(strategy)
+
+    collateral_value = sum(amount * price for _, amount, price, _ in basket)
+    ltv = compute_ltv(strategy["position"]["borrowed_amount"], collateral_value)
+    threshold = weighted_liquidation_threshold(basket)
+
+    return {
+        "protocol": strategy["protocol"]["name"],
+        "current_ltv_pct": round(ltv * 100, 2),
+        "liquidation_threshold_pct": round(threshold * 100, 2),
+        "liquidation_price": None,
+        "liquidation_drop_pct": round(max(1 - ltv / threshold, 0) * 100, 2),
+        "collateral_assets": [asset for asset, _, _, _ in basket],
     }
 
 
@@ -87,7 +264,19 @@ def generate_risk_report(strategy: dict) -> Dict:
     CLI-oriented deterministic risk report.
     This is NOT used by the modular reporting pipeline,
     but is preserved for backward compatibility.
+
+    A collateral basket is stressed with uniform drops, like
+    generate_base_report; it has no liquidation price, and the stress
+    results' new_price is the stressed basket value.
     """
+    if is_multi_asset(strategy):
+        report = generate_risk_report(single_collateral_equivalent(strategy))
+        report["liquidation_price"] = None
+        report["collateral_assets"] = [
+            asset for asset, _, _, _ in collateral_basket(strategy)
+        ]
+        return report
+
     position = strategy["position"]
     market = strategy["market"]
     protocol = strategy["protocol"]
@@ -100,8 +289,14 @@ def generate_risk_report(strategy: dict) -> Dict:
     initial_value = collateral_amount * collateral_price
     initial_ltv = compute_ltv(borrowed, initial_value)
 
+    liquidation_price = compute_liquidation_price(
+        collateral_amount, borrowed, liquidation_threshold
+    )
+    liquidation_drop = max(
+        compute_liquidation_drop(collateral_price, liquidation_price), 0
+    )
+
     scenarios = []
-    liquidation_point = None
 
     for drop in [0.10, 0.20, 0.30, 0.40]:
         result = simulate_price_drop(
@@ -113,14 +308,13 @@ def generate_risk_report(strategy: dict) -> Dict:
         )
         scenarios.append(result)
 
-        if result["liquidated"] and liquidation_point is None:
-            liquidation_point = result["price_drop_pct"]
-
+    # Same bands as the old 10% grid: LOW survives a 40% drop,
+    # MEDIUM survives 20%, HIGH is liquidated at or before 20%.
     risk_level = (
         "LOW"
-        if liquidation_point is None
+        if liquidation_drop >= 0.40
         else "MEDIUM"
-        if liquidation_point >= 30
+        if liquidation_drop >= 0.20
         else "HIGH"
     )
 
@@ -128,7 +322,8 @@ def generate_risk_report(strategy: dict) -> Dict:
         "protocol": protocol["name"],
         "current_ltv_pct": round(initial_ltv * 100, 2),
         "liquidation_threshold_pct": liquidation_threshold * 100,
-        "liquidation_price_drop_pct": liquidation_point,
+        "liquidation_price": round(liquidation_price, 2),
+        "liquidation_price_drop_pct": round(liquidation_drop * 100, 2),
         "risk_level": risk_level,
         "stress_test_results": scenarios,
     }
@@ -196,12 +391,10 @@ def main():
     print(f"Liquidation Threshold: {report['liquidation_threshold_pct']}%")
     print(f"Risk Level: {report['risk_level']}")
 
-    if report["liquidation_price_drop_pct"]:
-        print(
-            f"Liquidation occurs at ~{report['liquidation_price_drop_pct']}% price drop"
-        )
-    else:
-        print("No liquidation observed in tested scenarios")
+    print(
+        f"Liquidation occurs below ${report['liquidation_price']:,.2f} "
+        f"({report['liquidation_price_drop_pct']}% price drop)"
+    )
 
     print("\nStress Scenarios:")
     for s in report["stress_test_results"]:
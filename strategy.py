@@ -0,0 +1,125 @@
+from collections.abc import Mapping
+from types import MappingProxyType
+
+# =========================================================
+# Immutable strategy model
+# =========================================================
+
+
+class Strategy(Mapping):
+    """
+    Frozen strategy document (protocol / market / position sections).
+
+    Behaves like the nested dict from strategy.yaml for reads, but every
+    section is a read-only mapping. Variants are built with override()
+    and with_section(), which share every untouched section with the
+    original instead of deep-copying the document.
+    """
+
+    __slots__ = ("_sections",)
+
+    def __init__(self, document: Mapping):
+        sections = {
+            name: (
+                section if isinstance(section, MappingProxyType)
+                else MappingProxyType(dict(section))
+                if isinstance(section, Mapping)
+                else section
+            )
+            for name, section in document.items()
+        }
+        object.__setattr__(self, "_sections", sections)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Strategy is immutable; use override()")
+
+    def __delattr__(self, name):
+        raise AttributeError("Strategy is immutable")
+
+    def __reduce__(self):
+        return (Strategy, (self.to_dict(),))
+
+    def __repr__(self) -> str:
+        return f"Strategy({self.to_dict()!r})"
+
+    # Mapping interface (read-only, dict-compatible)
+
+    def __getitem__(self, name):
+        return self._sections[name]
+
+    def __iter__(self):
+        return iter(self._sections)
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+    # Copy-on-write overlays
+
+    def override(self, section: str, **fields) -> "Strategy":
+        """
+        New strategy with fields of one section replaced.
+        Only that section is copied (shallowly).
+        """
+        return self.with_section(section, {**self._sections[section], **fields})
+
+    def with_section(self, section: str, values: Mapping) -> "Strategy":
+        """
+        New strategy with one section replaced wholesale.
+        """
+        sections = dict(self._sections)
+        sections[section] = values
+
+        return Strategy(sections)
+
+    def to_dict(self) -> dict:
+        """
+        Plain nested dicts (e.g. for YAML/JSON output).
+        """
+        return {
+            name: dict(section) if isinstance(section, Mapping) else section
+            for name, section in self._sections.items()
+        }
+
+    # Fast accessors for the single-collateral schema
+
+    @property
+    def collateral_amount(self) -> float:
+        return self._single_collateral("position", "collateral_amount")
+
+    @property
+    def borrowed_amount(self) -> float:
+        return self._sections["position"]["borrowed_amount"]
+
+    @property
+    def collateral_price(self) -> float:
+        return self._single_collateral("market", "collateral_price")
+
+    @property
+    def liquidation_threshold(self) -> float:
+        return self._sections["protocol"]["liquidation_threshold"]
+
+    @property
+    def protocol_name(self) -> str:
+        return self._sections["protocol"]["name"]
+
+    def _single_collateral(self, section: str, field: str):
+        try:
+            return self._sections[section][field]
+        except KeyError:
+            if "collateral" in self._sections.get("position", {}):
+                raise ValueError(
+                    f"{field} is undefined for a multi-asset collateral basket; "
+                    "use simulator.collateral_basket() or "
+                    "simulator.single_collateral_equivalent()"
+                ) from None
+            raise
+
+
+def as_strategy(strategy) -> Strategy:
+    """
+    Return strategy unchanged if it is already a Strategy,
+    otherwise wrap the plain dict document.
+    """
+    if isinstance(strategy, Strategy):
+        return strategy
+    return Strategy(strategy)
@@ -0,0 +1,259 @@
+import csv
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+from defi_risk_agent.batch import PositionBatch
+from defi_risk_agent.instrumentation import instrumented
+from defi_risk_agent.scoring.risk_surface import RISK_ZONES, classify_risk_zone_codes
+from defi_risk_agent.simulator import compute_ltv
+
+# Ticks read from a price series at a time (1-D, cheap)
+DEFAULT_WINDOW = 100_000
+# (tick, position) cells evaluated at a time, bounding the (T, N) arrays
+DEFAULT_BLOCK_SIZE = 1_000_000
+
+
+# =========================================================
+# Price series sources (streamed in windows)
+#
+# A window is a (timestamps, prices) pair of 1-D arrays.
+# =========================================================
+
+def iter_csv_prices(
+    path,
+    window: int = DEFAULT_WINDOW,
+    price_column: str = "price",
+    timestamp_column: str = "timestamp",
+):
+    """
+    Stream a CSV price series (header row required) in windows of at
+    most `window` rows. Timestamps are kept as strings.
+    """
+    with open(path, "r", newline="") as f:
+        reader = (row for row in csv.reader(f) if row)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError(f"CSV is empty: {path}")
+        header = [h.strip() for h in header]
+
+        if price_column not in header:
+            raise ValueError(f"CSV has no {price_column!r} column: {header}")
+        price_at = header.index(price_column)
+        timestamp_at = header.index(timestamp_column) if timestamp_column in header else None
+
+        while True:
+            rows = list(islice(reader, window))
+            if not rows:
+                return
+
+            prices = np.array([row[price_at] for row in rows], dtype=float)
+            timestamps = (
+                np.array([row[timestamp_at] for row in rows])
+                if timestamp_at is not None
+                else None
+            )
+            yield timestamps, prices
+
+
+def iter_array_prices(path, window: int = DEFAULT_WINDOW):
+    """
+    Stream a columnar price series, memory-mapped:
+    - a .npy file of prices, shape (T,), or [timestamp, price] rows, shape (T, 2)
+    - a directory with price.npy and optional timestamp.npy
+    """
+    path = Path(path)
+
+    if path.is_dir():
+        prices = np.load(path / "price.npy", mmap_mode="r")
+        timestamps = (
+            np.load(path / "timestamp.npy", mmap_mode="r")
+            if (path / "timestamp.npy").exists()
+            else None
+        )
+    else:
+        values = np.load(path, mmap_mode="r")
+        if values.ndim == 2:
+            timestamps, prices = values[:, 0], values[:, 1]
+        else:
+            timestamps, prices = None, values
+
+    for start in range(0, len(prices), window):
+        block = slice(start, start + window)
+        yield (
+            None if timestamps is None else np.asarray(timestamps[block]),
+            np.asarray(prices[block], dtype=float),
+        )
+
+
+def iter_price_windows(path, window: int = DEFAULT_WINDOW, **csv_options):
+    """
+    Dispatch on the file type: .csv, .npy or a columnar directory.
+    """
+    if Path(path).suffix.lower() == ".csv":
+        return iter_csv_prices(path, window, **csv_options)
+    return iter_array_prices(path, window)
+
+
+# =========================================================
+# Backtest
+# =========================================================
+
+@instrumented(scenarios=lambda r: r["ltv_pct"].size)
+def evaluate_window(batch: PositionBatch, prices) -> dict:
+    """
+    LTV, risk zone and liquidation flag for every (timestamp, position),
+    shape (T, N). Zones use LTV rounded to 0.01% like the report rows
+    classified by classify_risk_zone; liquidated is the exact
+    LTV > threshold test of simulate_price_drop.
+    """
+    prices = np.asarray(prices, dtype=float)
+
+    ltv = compute_ltv(
+        batch.borrowed_amount[None, :],
+        batch.collateral_amount[None, :] * prices[:, None],
+    )
+    ltv_pct = np.round(ltv * 100, 2)
+
+    return {
+        "ltv_pct": ltv_pct,
+        "zones": classify_risk_zone_codes(ltv_pct, batch.liquidation_threshold * 100),
+        "liquidated": ltv > batch.liquidation_threshold,
+    }
+
+
+def window_ticks(positions: int, block_size: int = DEFAULT_BLOCK_SIZE) -> int:
+    """
+    Ticks per evaluated window so that a window holds about block_size
+    (tick, position) cells.
+    """
+    return max(1, block_size // max(positions, 1))
+
+
+def _split_windows(windows, ticks: int):
+    for timestamps, prices in windows:
+        for start in range(0, len(prices), ticks):
+            block = slice(start, start + ticks)
+            yield (None if timestamps is None else timestamps[block]), prices[block]
+
+
+@instrumented
+def run_backtest(
+    batch: PositionBatch,
+    windows,
+    on_window=None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> dict:
+    """
+    Replay a price series (an iterable of (timestamps, prices) windows,
+    e.g. from iter_price_windows) against every position in the book.
+
+    Source windows are split so that each evaluated window holds at
+    most about block_size (tick, position) cells (see window_ticks),
+    like iter_scenario_grid; only one window of (T, N) arrays is alive
+    at a time. on_window, if given, receives each evaluated window's
+    evaluate_window output together with its row offset and timestamps.
+
+    The result keeps per-position and per-tick aggregates plus every
+    liquidation event: a tick at which a position goes from not
+    liquidated to liquidated (the first tick counts if it is already
+    liquidated).
+    """
+    n = len(batch)
+
+    zone_ticks = np.zeros((n, len(RISK_ZONES)), dtype=np.int64)
+    max_ltv_pct = np.full(n, -np.inf)
+    first_liquidation = np.full(n, -1, dtype=np.int64)
+    previous = np.zeros(n, dtype=bool)
+
+    zone_counts = []
+    events = {"index": [], "position": [], "price": [], "ltv_pct": []}
+    event_timestamps = []
+    has_timestamps = True
+    offset = 0
+
+    for timestamps, prices in _split_windows(windows, window_ticks(n, block_size)):
+        if len(prices) == 0:
+            continue
+
+        window = evaluate_window(batch, prices)
+        zones, liquidated = window["zones"], window["liquidated"]
+
+        if on_window is not None:
+            on_window(offset, timestamps, window)
+
+        # Per-position aggregates
+        for code in range(len(RISK_ZONES)):
+            zone_ticks[:, code] += (zones == code).sum(axis=0)
+        np.maximum(max_ltv_pct, window["ltv_pct"].max(axis=0), out=max_ltv_pct)
+
+        # Per-tick aggregates
+        zone_counts.append(np.stack(
+            [(zones == code).sum(axis=1) for code in range(len(RISK_ZONES))],
+            axis=1,
+        ))
+
+        # Liquidation events: rising edges, carried across windows
+        entered = liquidated & ~np.vstack([previous[None, :], liquidated[:-1]])
+        ticks, positions = np.nonzero(entered)
+
+        events["index"].append(ticks + offset)
+        events["position"].append(positions)
+        events["price"].append(np.asarray(prices, dtype=float)[ticks])
+        events["ltv_pct"].append(window["ltv_pct"][ticks, positions])
+        if timestamps is None:
+            has_timestamps = False
+        elif has_timestamps:
+            event_timestamps.append(np.asarray(timestamps)[ticks])
+
+        first = (first_liquidation < 0) & liquidated.any(axis=0)
+        first_liquidation[first] = offset + liquidated[:, first].argmax(axis=0)
+
+        previous = liquidated[-1].copy()
+        offset += len(prices)
+
+    # np.nonzero is row-major, so events are already ordered by tick,
+    # then position
+    events = {
+        name: np.concatenate(values) if values else np.zeros(0, dtype=np.int64)
+        for name, values in events.items()
+    }
+    if has_timestamps and event_timestamps:
+        events["timestamp"] = np.concatenate(event_timestamps)
+
+    return {
+        "ticks": offset,
+        "positions": n,
+        "events": events,
+        "first_liquidation_index": first_liquidation,
+        "zone_ticks": zone_ticks,
+        "max_ltv_pct": max_ltv_pct,
+        "zone_counts": (
+            np.concatenate(zone_counts)
+            if zone_counts
+            else np.zeros((0, len(RISK_ZONES)), dtype=np.int64)
+        ),
+        "liquidated_at_end": previous,
+    }
+
+
+def backtest_summary(result: dict) -> dict:
+    """
+    JSON-friendly headline numbers of a run_backtest result.
+    """
+    zone_ticks = result["zone_ticks"].sum(axis=0)
+    total = int(zone_ticks.sum())
+
+    return {
+        "ticks": result["ticks"],
+        "positions": result["positions"],
+        "liquidation_events": int(len(result["events"]["position"])),
+        "positions_ever_liquidated": int((result["first_liquidation_index"] >= 0).sum()),
+        "positions_liquidated_at_end": int(result["liquidated_at_end"].sum()),
+        "zone_time_pct": {
+            zone: round(int(count) / total * 100, 2) if total else 0.0
+            for zone, count in zip(RISK_ZONES, zone_ticks)
+        },
+    }
+
@@ -1,28 +1,28 @@
-from defi_risk_agent.simulator import compute_ltv
+from defi_risk_agent.instrumentation import instrumented
+from defi_risk_agent.simulator import compute_ltv, single_collateral_equivalent
 
 
-def leverage_sensitivity(strategy: dict):
-    borrowed_levels = [7000, 8000, 9000, 10000, 11000]
+BORROWED_LEVELS = [7000, 8000, 9000, 10000, 11000]
 
-    position = strategy["position"]
-    market = strategy["market"]
-    protocol = strategy["protocol"]
 
-    collateral_value = (
-        position["collateral_amount"] * market["collateral_price"]
-    )
+@instrumented(scenarios=len)
+def leverage_sensitivity(strategy: dict, borrowed_levels=BORROWED_LEVELS):
+    strategy = single_collateral_equivalent(strategy)
+    liquidation_threshold = strategy.liquidation_threshold
+
+    collateral_value = strategy.collateral_amount * strategy.collateral_price
 
     results = []
 
     for borrowed in borrowed_levels:
         ltv = compute_ltv(borrowed, collateral_value)
-        buffer = protocol["liquidation_threshold"] - ltv
+        buffer = liquidation_threshold - ltv
 
         results.append({
             "borrowed": borrowed,
             "ltv_pct": round(ltv * 100, 2),
             "safety_buffer_pct": round(buffer * 100, 2),
-            "liquidated": ltv > protocol["liquidation_threshold"],
+            "liquidated": ltv > liquidation_threshold,
         })
 
     return results
@@ -0,0 +1,124 @@
+import numpy as np
+
+from defi_risk_agent.batch import PositionBatch, solve_liquidation_batch
+from defi_risk_agent.instrumentation import instrumented
+from defi_risk_agent.stress.scenario_matrix import MAX_DROP_CAP
+
+
+# =========================================================
+# Price impact models
+# f(cumulative collateral sold) -> fractional price drop
+# =========================================================
+
+def linear_price_impact(coefficient: float):
+    """
+    Price falls by coefficient per unit of collateral sold.
+    """
+    @instrumented(name="stress.liquidation_cascade.linear_price_impact.impact")
+    def impact(collateral_sold: float) -> float:
+        return min(coefficient * collateral_sold, MAX_DROP_CAP)
+
+    return impact
+
+
+def square_root_price_impact(coefficient: float):
+    """
+    Square-root market impact: coefficient * sqrt(collateral sold).
+    """
+    @instrumented(name="stress.liquidation_cascade.square_root_price_impact.impact")
+    def impact(collateral_sold: float) -> float:
+        return min(coefficient * np.sqrt(collateral_sold), MAX_DROP_CAP)
+
+    return impact
+
+
+# =========================================================
+# Cascade
+# =========================================================
+
+@instrumented
+def run_liquidation_cascade(
+    batch: PositionBatch,
+    initial_shock: float,
+    price_impact,
+    price: float = None,
+    close_factor: float = 1.0,
+    liquidation_bonus: float = 0.0,
+    max_rounds: int = 10_000,
+) -> dict:
+    """
+    Iterate shock -> liquidations -> forced selling -> lower price
+    until no new position is liquidated.
+
+    Each liquidated position repays close_factor of its debt and sells
+    collateral worth the repaid debt plus liquidation_bonus (capped at
+    its collateral) at the price of its round. The market price is
+    price * (1 - initial_shock) * (1 - price_impact(total sold)).
+
+    Positions are sorted once by liquidation price, so each round only
+    touches the positions it newly liquidates: total work is
+    O(n log n) for the sort plus O(n) across all rounds.
+    """
+    if price is None:
+        if len(batch) and not np.all(batch.price == batch.price[0]):
+            raise ValueError(
+                "Book has several collateral prices; pass the market price"
+            )
+        price = float(batch.price[0]) if len(batch) else 0.0
+
+    critical_price = solve_liquidation_batch(batch)["critical_price"]
+
+    # Most fragile (highest liquidation price) first
+    order = np.argsort(-critical_price, kind="stable")
+    descending = critical_price[order]
+    debt = batch.borrowed_amount[order]
+    collateral = batch.collateral_amount[order]
+
+    shocked_price = price * (1 - initial_shock)
+    market_price = shocked_price
+
+    liquidated = 0
+    repaid_debt = 0.0
+    collateral_sold = 0.0
+    rounds = []
+
+    while len(rounds) < max_rounds:
+        # Positions with liquidation price strictly above the market.
+        # Liquidations are final: a price_impact that is not monotone
+        # may lift the price, which ends the cascade instead of
+        # un-liquidating anyone.
+        reached = int(np.searchsorted(-descending, -market_price, side="left"))
+        if reached <= liquidated:
+            break
+
+        block = slice(liquidated, reached)
+        repaid = close_factor * debt[block]
+        sold = np.minimum(
+            collateral[block],
+            repaid * (1 + liquidation_bonus) / market_price,
+        )
+
+        repaid_debt += float(repaid.sum())
+        collateral_sold += float(sold.sum())
+        rounds.append({
+            "price": market_price,
+            "newly_liquidated": reached - liquidated,
+            "cumulative_liquidated_debt": repaid_debt,
+            "cumulative_collateral_sold": collateral_sold,
+        })
+
+        liquidated = reached
+        market_price = max(shocked_price * (1 - price_impact(collateral_sold)), 0.0)
+
+    return {
+        "initial_price": price,
+        "shocked_price": shocked_price,
+        "final_price": market_price,
+        "final_drop_pct": round((1 - market_price / price) * 100, 2) if price else 0.0,
+        "liquidated_positions": liquidated,
+        "liquidated_debt": repaid_debt,
+        "collateral_sold": collateral_sold,
+        "converged": len(rounds) < max_rounds,
+        "rounds": rounds,
+        "liquidated_index": order[:liquidated],
+    }
@@ -0,0 +1,158 @@
+import numpy as np
+
+from defi_risk_agent.batch import PositionBatch, solve_liquidation_batch
+from defi_risk_agent.instrumentation import instrumented
+from defi_risk_agent.stress.scenario_matrix import VOLATILITY_REGIMES
+
+# Annualised collateral volatility in the "normal" regime.
+# VOLATILITY_REGIMES multipliers scale it per regime.
+BASE_VOLATILITY = 0.80
+
+STEPS_PER_YEAR = 365
+
+
+# =========================================================
+# Path generation (seeded, chunk-invariant)
+# =========================================================
+
+def _path_generators(seed: int):
+    """
+    Independent streams for diffusion, jump counts and jump sizes.
+    Each stream is consumed sequentially, so the paths do not depend
+    on chunk_size.
+    """
+    return [
+        np.random.default_rng(s)
+        for s in np.random.SeedSequence(seed).spawn(3)
+    ]
+
+
+def _log_return_chunk(
+    generators,
+    n_paths: int,
+    n_steps: int,
+    volatility: float,
+    drift: float,
+    dt: float,
+    jump_intensity: float,
+    jump_mean: float,
+    jump_std: float,
+):
+    diffusion, jump_counts, jump_sizes = generators
+
+    z = diffusion.standard_normal((n_paths, n_steps))
+    log_returns = (drift - 0.5 * volatility ** 2) * dt + volatility * np.sqrt(dt) * z
+
+    if jump_intensity > 0:
+        n_jumps = jump_counts.poisson(jump_intensity * dt, (n_paths, n_steps))
+        log_returns += (
+            n_jumps * jump_mean
+            + np.sqrt(n_jumps) * jump_std * jump_sizes.standard_normal((n_paths, n_steps))
+        )
+
+    return log_returns
+
+
+# =========================================================
+# First-passage statistics
+# =========================================================
+
+@instrumented(scenarios=lambda r: r["n_paths"] * len(r["regimes"]))
+def run_monte_carlo(
+    batch: PositionBatch,
+    n_paths: int = 10_000,
+    n_steps: int = 30,
+    dt: float = 1 / STEPS_PER_YEAR,
+    base_volatility: float = BASE_VOLATILITY,
+    drift: float = 0.0,
+    jump_intensity: float = 0.0,
+    jump_mean: float = 0.0,
+    jump_std: float = 0.0,
+    volatility_regimes: dict = VOLATILITY_REGIMES,
+    seed: int = 0,
+    chunk_size: int = 10_000,
+) -> dict:
+    """
+    Path-dependent liquidation probability per position and regime.
+
+    Simulates n_paths GBM paths (optionally with normal log-jumps) of
+    the collateral price relative to today's price, over n_steps steps
+    of length dt. A position is liquidated on a path the first time the
+    price falls strictly below its liquidation price.
+
+    Every regime uses the same random numbers with volatility scaled by
+    its multiplier, so results are reproducible from seed and regimes
+    differ only through volatility. Paths are processed chunk_size at a
+    time; memory is O(chunk_size * n_steps + positions).
+    """
+    n_positions = len(batch)
+
+    # Liquidation barrier in log-price relative to today's price
+    critical_price = solve_liquidation_batch(batch)["critical_price"]
+    with np.errstate(divide="ignore"):
+        barrier = np.log(critical_price / batch.price)
+
+    order = np.argsort(barrier)
+    sorted_barrier = barrier[order]
+
+    results = {}
+
+    for regime, multiplier in volatility_regimes.items():
+        generators = _path_generators(seed)
+
+        hits = np.zeros(n_positions, dtype=np.int64)
+        hit_step_total = np.zeros(n_positions, dtype=np.int64)
+
+        for start in range(0, n_paths, chunk_size):
+            size = min(chunk_size, n_paths - start)
+
+            log_returns = _log_return_chunk(
+                generators, size, n_steps, base_volatility * multiplier,
+                drift, dt, jump_intensity, jump_mean, jump_std,
+            )
+            running_min = np.minimum.accumulate(
+                np.minimum(np.cumsum(log_returns, axis=1), 0.0), axis=1
+            )
+
+            # Paths whose running minimum is below each sorted barrier:
+            # a path with value m hits every barrier strictly above m.
+            final_hits = _count_below(sorted_barrier, running_min[:, -1])
+            step_hits = _count_below(sorted_barrier, running_min.ravel())
+
+            hits += final_hits
+            # For hit paths, steps survived = n_steps - steps spent below
+            hit_step_total += n_steps * final_hits - step_hits
+
+        probability = np.empty(n_positions)
+        probability[order] = hits / n_paths
+
+        mean_steps = np.full(n_positions, np.nan)
+        hit = hits > 0
+        mean_steps[order[hit]] = hit_step_total[hit] / hits[hit] + 1
+
+        # Already past the threshold today
+        mean_steps[barrier > 0] = 0.0
+
+        results[regime] = {
+            "volatility": base_volatility * multiplier,
+            "liquidation_probability": probability,
+            "mean_steps_to_liquidation": mean_steps,
+        }
+
+    return {
+        "n_paths": n_paths,
+        "n_steps": n_steps,
+        "dt": dt,
+        "seed": seed,
+        "regimes": results,
+    }
+
+
+def _count_below(sorted_barrier, values):
+    """
+    For each sorted barrier b, the number of values strictly below b.
+    """
+    index = np.searchsorted(sorted_barrier, values, side="right")
+    counts = np.bincount(index, minlength=len(sorted_barrier) + 1)
+
+    return np.cumsum(counts)[:len(sorted_barrier)]
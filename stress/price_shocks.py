@@ -1,22 +1,23 @@
-from defi_risk_agent.simulator import simulate_price_drop
+from defi_risk_agent.instrumentation import instrumented
+from defi_risk_agent.simulator import simulate_price_drop, single_collateral_equivalent
 
 
-def run_price_shocks(strategy: dict):
-    drops = [0.10, 0.20, 0.30, 0.40, 0.50]
+PRICE_SHOCK_DROPS = [0.10, 0.20, 0.30, 0.40, 0.50]
 
-    position = strategy["position"]
-    market = strategy["market"]
-    protocol = strategy["protocol"]
+
+@instrumented(scenarios=len)
+def run_price_shocks(strategy: dict, drops=PRICE_SHOCK_DROPS):
+    strategy = single_collateral_equivalent(strategy)
 
     results = []
 
     for d in drops:
         results.append(
             simulate_price_drop(
-                collateral_amount=position["collateral_amount"],
-                price=market["collateral_price"],
-                borrowed=position["borrowed_amount"],
-                liquidation_threshold=protocol["liquidation_threshold"],
+                collateral_amount=strategy.collateral_amount,
+                price=strategy.collateral_price,
+                borrowed=strategy.borrowed_amount,
+                liquidation_threshold=strategy.liquidation_threshold,
                 drop_pct=d,
             )
         )
@@ -1,3 +1,8 @@
+from defi_risk_agent.instrumentation import instrumented
+from defi_risk_agent.simulator import single_collateral_equivalent
+
+
+@instrumented(scenarios=len)
 def regime_matrix(strategy: dict):
     regimes = {
         "low": 0.15,
@@ -5,11 +10,10 @@ def regime_matrix(strategy: dict):
         "high": 0.50,
     }
 
-    borrowed = strategy["position"]["borrowed_amount"]
-    collateral_value = (
-        strategy["position"]["collateral_amount"]
-        * strategy["market"]["collateral_price"]
-    )
+    strategy = single_collateral_equivalent(strategy)
+
+    borrowed = strategy.borrowed_amount
+    collateral_value = strategy.collateral_amount * strategy.collateral_price
 
     results = {}
 
@@ -18,7 +22,7 @@ def regime_matrix(strategy: dict):
         results[name] = {
             "assumed_drop_pct": drop * 100,
             "ltv_pct": round(ltv * 100, 2),
-            "liquidated": ltv > strategy["protocol"]["liquidation_threshold"],
+            "liquidated": ltv > strategy.liquidation_threshold,
         }
 
     return results
@@ -1,5 +1,10 @@
 from itertools import product
-from defi_risk_agent.simulator import compute_ltv
+
+import numpy as np
+
+from defi_risk_agent.instrumentation import instrumented
+from defi_risk_agent.simulator import collateral_basket, compute_ltv, is_multi_asset
+from defi_risk_agent.strategy import as_strategy
 
 PRICE_SHOCKS = [0.10, 0.20, 0.30, 0.40, 0.50]
 BORROW_MULTIPLIERS = [0.8, 1.0, 1.2]
@@ -14,36 +19,391 @@ VOLATILITY_REGIMES = {
 MAX_DROP_CAP = 0.95
 
 
-def run_scenario_matrix(strategy: dict):
-    position = strategy["position"]
-    market = strategy["market"]
-    protocol = strategy["protocol"]
+# =========================================================
+# Vectorized engine (columnar output)
+# =========================================================
 
-    base_borrowed = position["borrowed_amount"]
-    collateral_amount = position["collateral_amount"]
-    price = market["collateral_price"]
-    liquidation_threshold = protocol["liquidation_threshold"]
+@instrumented
+def scenario_effective_drop(price_shocks, vol_multipliers):
+    """
+    Capped effective drop, shape (S, 1, R).
+    """
+    return np.minimum(
+        np.asarray(price_shocks, dtype=float)[:, None, None]
+        * np.asarray(vol_multipliers, dtype=float)[None, None, :],
+        MAX_DROP_CAP,
+    )
 
-    results = []
 
-    for price_shock, borrow_mult, (regime, vol_mult) in product(
-        PRICE_SHOCKS, BORROW_MULTIPLIERS, VOLATILITY_REGIMES.items()
-    ):
-        borrowed = base_borrowed * borrow_mult
-        effective_drop = min(price_shock * vol_mult, MAX_DROP_CAP)
+@instrumented(scenarios=np.size)
+def scenario_ltv(
+    collateral_amount,
+    price,
+    borrowed,
+    effective_drop,
+    borrow_multipliers,
+):
+    """
+    LTV over the (S, B, R) scenario axes.
+    borrowed may be an array; its shape is prepended to the result.
+    """
+    new_price = price * (1 - effective_drop)
+    new_collateral_value = collateral_amount * new_price
+
+    borrowed = np.asarray(borrowed, dtype=float)[..., None, None, None]
+    borrowed = borrowed * np.asarray(borrow_multipliers, dtype=float)[:, None]
+
+    return compute_ltv(borrowed, new_collateral_value)
+
+
+@instrumented(scenarios=lambda r: r["ltv"].size)
+def run_scenario_grid(
+    strategy: dict,
+    price_shocks=PRICE_SHOCKS,
+    borrow_multipliers=BORROW_MULTIPLIERS,
+    volatility_regimes: dict = VOLATILITY_REGIMES,
+) -> dict:
+    """
+    Evaluate the full price shock x borrow multiplier x volatility regime
+    grid as broadcast arrays.
+
+    Every result array has shape (len(price_shocks), len(borrow_multipliers),
+    len(volatility_regimes)); flattening in C order reproduces the row
+    order of run_scenario_matrix.
+
+    Collateral baskets are evaluated by run_multi_asset_scenario_grid
+    (see _basket_scenario_grid).
+    """
+    strategy = as_strategy(strategy)
+    if is_multi_asset(strategy):
+        return _basket_scenario_grid(
+            strategy, price_shocks, borrow_multipliers, volatility_regimes
+        )
+
+    shocks = np.asarray(price_shocks, dtype=float)
+    multipliers = np.asarray(borrow_multipliers, dtype=float)
+    regimes = list(volatility_regimes)
+    vol_multipliers = np.asarray(
+        [volatility_regimes[r] for r in regimes], dtype=float
+    )
+
+    effective_drop = scenario_effective_drop(shocks, vol_multipliers)
+    ltv = scenario_ltv(
+        strategy.collateral_amount,
+        strategy.collateral_price,
+        strategy.borrowed_amount,
+        effective_drop,
+        multipliers,
+    )
+    shape = ltv.shape
+
+    return {
+        "price_shocks": shocks,
+        "borrow_multipliers": multipliers,
+        "volatility_regimes": regimes,
+        "volatility_multipliers": vol_multipliers,
+        "effective_drop": np.broadcast_to(effective_drop, shape),
+        "ltv": ltv,
+        "liquidated": ltv > strategy.liquidation_threshold,
+    }
+
 
-        new_price = price * (1 - effective_drop)
-        new_collateral_value = collateral_amount * new_price
-        ltv = compute_ltv(borrowed, new_collateral_value)
+@instrumented(scenarios=lambda r: r["ltv"].size)
+def iter_scenario_grid(
+    strategy: dict,
+    price_shocks=PRICE_SHOCKS,
+    borrow_multipliers=BORROW_MULTIPLIERS,
+    volatility_regimes: dict = VOLATILITY_REGIMES,
+    block_size: int = 1_000_000,
+):
+    """
+    Yield the scenario grid in blocks of at most block_size cells, in
+    the row order of run_scenario_grid. Blocks are split along the price
+    shock axis and, when one shock row alone exceeds block_size, along
+    the borrow axis too; a block always holds every volatility regime,
+    so it has at most max(block_size, len(volatility_regimes)) cells.
+    Each block has the same format as run_scenario_grid.
+    """
+    regimes = max(len(volatility_regimes), 1)
+    cells_per_shock = len(borrow_multipliers) * regimes
 
-        results.append({
+    if cells_per_shock <= block_size:
+        shocks_per_block = max(1, block_size // max(cells_per_shock, 1))
+        for start in range(0, len(price_shocks), shocks_per_block):
+            yield run_scenario_grid(
+                strategy,
+                price_shocks[start:start + shocks_per_block],
+                borrow_multipliers,
+                volatility_regimes,
+            )
+        return
+
+    borrows_per_block = max(1, block_size // regimes)
+    for shock in range(len(price_shocks)):
+        for start in range(0, len(borrow_multipliers), borrows_per_block):
+            yield run_scenario_grid(
+                strategy,
+                price_shocks[shock:shock + 1],
+                borrow_multipliers[start:start + borrows_per_block],
+                volatility_regimes,
+            )
+
+
+@instrumented(scenarios=len)
+def materialize_scenario_rows(grid: dict) -> list:
+    """
+    Expand a columnar scenario grid into the list-of-dicts format
+    produced by run_scenario_matrix. Basket grids, whose liquidation
+    threshold moves with the scenario, also carry it per row.
+    """
+    regimes = grid["volatility_regimes"]
+    vol_multipliers = grid["volatility_multipliers"].tolist()
+
+    effective_drop = grid["effective_drop"].tolist()
+    ltv = grid["ltv"].tolist()
+    liquidated = grid["liquidated"].tolist()
+    thresholds = (
+        grid["liquidation_threshold"].tolist()
+        if "liquidation_threshold" in grid
+        else None
+    )
+
+    results = []
+
+    for (i, price_shock), (j, borrow_mult), k in product(
+        enumerate(grid["price_shocks"].tolist()),
+        enumerate(grid["borrow_multipliers"].tolist()),
+        range(len(regimes)),
+    ):
+        row = {
             "price_shock_pct": round(price_shock * 100, 1),
             "borrow_multiplier": borrow_mult,
-            "volatility_regime": regime,
-            "volatility_multiplier": vol_mult,
-            "effective_drop_pct": round(effective_drop * 100, 1),
-            "ltv_pct": round(ltv * 100, 2),
-            "liquidated": ltv > liquidation_threshold,
-        })
+            "volatility_regime": regimes[k],
+            "volatility_multiplier": vol_multipliers[k],
+            "effective_drop_pct": round(effective_drop[i][j][k] * 100, 1),
+            "ltv_pct": round(ltv[i][j][k] * 100, 2),
+            "liquidated": liquidated[i][j][k],
+        }
+        if thresholds is not None:
+            row["liquidation_threshold_pct"] = round(thresholds[i][k] * 100, 2)
+        results.append(row)
 
     return results
+
+
+# =========================================================
+# Multi-asset collateral (correlated shock vectors)
+# =========================================================
+
+@instrumented
+def regime_covariances(
+    base_covariance,
+    volatility_regimes: dict = VOLATILITY_REGIMES,
+) -> np.ndarray:
+    """
+    Per-regime asset covariance, shape (R, A, A): the base covariance
+    scaled by the square of each regime's volatility multiplier.
+    Pass a hand-built (R, A, A) stack instead to let correlations
+    change across regimes.
+    """
+    base_covariance = np.asarray(base_covariance, dtype=float)
+    vol_multipliers = np.asarray(list(volatility_regimes.values()), dtype=float)
+
+    return vol_multipliers[:, None, None] ** 2 * base_covariance
+
+
+@instrumented
+def correlated_shock_vectors(
+    price_shocks,
+    vol_multipliers,
+    covariances,
+    market_weights,
+) -> np.ndarray:
+    """
+    Per-asset fractional price drops, shape (S, R, A).
+
+    Each scenario moves the value-weighted market basket down by
+    shock * regime multiplier, as in the single-asset grid. The drop is
+    split across assets by their beta to the basket under the regime
+    covariance, beta_r = cov_r @ w / (w @ cov_r @ w), so the basket
+    falls by exactly the scenario drop and a single asset reduces to
+    the one-dimensional grid. Drops are capped at MAX_DROP_CAP.
+    """
+    covariances = np.asarray(covariances, dtype=float)
+    weights = np.asarray(market_weights, dtype=float)
+    weights = weights / weights.sum()
+
+    # (R, A)
+    exposure = covariances @ weights
+    betas = exposure / (exposure @ weights)[:, None]
+
+    basket_drop = (
+        np.asarray(price_shocks, dtype=float)[:, None]
+        * np.asarray(vol_multipliers, dtype=float)[None, :]
+    )
+
+    return np.minimum(basket_drop[:, :, None] * betas[None, :, :], MAX_DROP_CAP)
+
+
+@instrumented(scenarios=lambda r: r["ltv"].size)
+def run_multi_asset_scenario_grid(
+    amounts,
+    prices,
+    thresholds,
+    borrowed,
+    covariances,
+    price_shocks=PRICE_SHOCKS,
+    borrow_multipliers=BORROW_MULTIPLIERS,
+    volatility_regimes: dict = VOLATILITY_REGIMES,
+    market_weights=None,
+) -> dict:
+    """
+    Scenario grid for N positions holding A collateral assets.
+
+    amounts: (N, A), prices and thresholds: (A,) or (N, A),
+    borrowed: (N,), covariances: (R, A, A). market_weights default to
+    the book's aggregate collateral value per asset.
+
+    Stressed collateral values are contractions of the (N, A) value
+    matrix with the (S, R, A) shock vectors. LTV and liquidation flags
+    have shape (N, S, B, R); the weighted liquidation threshold moves
+    with the shocked asset mix and has shape (N, S, R).
+    """
+    amounts = np.atleast_2d(np.asarray(amounts, dtype=float))
+    values = amounts * np.asarray(prices, dtype=float)
+    threshold_values = values * np.asarray(thresholds, dtype=float)
+
+    shocks = np.asarray(price_shocks, dtype=float)
+    multipliers = np.asarray(borrow_multipliers, dtype=float)
+    regimes = list(volatility_regimes)
+    vol_multipliers = np.asarray(
+        [volatility_regimes[r] for r in regimes], dtype=float
+    )
+
+    if market_weights is None:
+        market_weights = values.sum(axis=0)
+
+    shock_vectors = correlated_shock_vectors(
+        shocks, vol_multipliers, covariances, market_weights
+    )
+    remaining = 1 - shock_vectors
+
+    # (N, A) x (S, R, A) -> (N, S, R)
+    stressed_value = np.einsum("na,sra->nsr", values, remaining)
+    stressed_threshold_value = np.einsum("na,sra->nsr", threshold_values, remaining)
+
+    # (N, 1, B, 1) / (N, S, 1, R) -> (N, S, B, R)
+    debt = np.asarray(borrowed, dtype=float)[:, None, None, None] * multipliers[:, None]
+    ltv = compute_ltv(debt, stressed_value[:, :, None, :])
+
+    return {
+        "price_shocks": shocks,
+        "borrow_multipliers": multipliers,
+        "volatility_regimes": regimes,
+        "volatility_multipliers": vol_multipliers,
+        "shock_vectors": shock_vectors,
+        "ltv": ltv,
+        "liquidation_threshold": stressed_threshold_value / stressed_value,
+        "liquidated": debt > stressed_threshold_value[:, :, None, :],
+    }
+
+
+def _basket_scenario_grid(
+    strategy,
+    price_shocks,
+    borrow_multipliers,
+    volatility_regimes: dict,
+) -> dict:
+    """
+    run_scenario_grid for one collateral basket. market.covariance
+    (A x A, in position.collateral order) sets how the assets move;
+    without it they fall together, by the same fraction. effective_drop
+    is the fall of the basket value, and the grid also carries the
+    per-asset shock_vectors and the shocked weighted
+    liquidation_threshold, shape (S, R).
+    """
+    basket = collateral_basket(strategy)
+    amounts = np.asarray([[amount for _, amount, _, _ in basket]], dtype=float)
+    prices = np.asarray([price for _, _, price, _ in basket], dtype=float)
+
+    covariance = strategy["market"].get("covariance")
+    if covariance is None:
+        covariance = np.ones((len(basket), len(basket)))
+
+    grid = run_multi_asset_scenario_grid(
+        amounts,
+        prices,
+        [threshold for _, _, _, threshold in basket],
+        [strategy["position"]["borrowed_amount"]],
+        regime_covariances(covariance, volatility_regimes),
+        price_shocks,
+        borrow_multipliers,
+        volatility_regimes,
+    )
+
+    values = amounts[0] * prices
+    basket_drop = 1 - (1 - grid["shock_vectors"]) @ values / values.sum()
+    ltv = grid["ltv"][0]
+
+    return {
+        "price_shocks": grid["price_shocks"],
+        "borrow_multipliers": grid["borrow_multipliers"],
+        "volatility_regimes": grid["volatility_regimes"],
+        "volatility_multipliers": grid["volatility_multipliers"],
+        "effective_drop": np.broadcast_to(basket_drop[:, None, :], ltv.shape),
+        "ltv": ltv,
+        "liquidated": grid["liquidated"][0],
+        "collateral_assets": [asset for asset, _, _, _ in basket],
+        "shock_vectors": grid["shock_vectors"],
+        "liquidation_threshold": grid["liquidation_threshold"][0],
+    }
+
+
+@instrumented
+def basket_columns(strategies) -> dict:
+    """
+    Stack strategies (single- or multi-asset) into the (N, A) columns
+    taken by run_multi_asset_scenario_grid. Assets a position does not
+    hold get zero amount.
+    """
+    baskets = [collateral_basket(as_strategy(s)) for s in strategies]
+    assets = sorted({asset for basket in baskets for asset, _, _, _ in basket})
+    column = {asset: i for i, asset in enumerate(assets)}
+
+    amounts = np.zeros((len(baskets), len(assets)))
+    prices = np.zeros_like(amounts)
+    thresholds = np.zeros_like(amounts)
+
+    for n, basket in enumerate(baskets):
+        for asset, amount, price, threshold in basket:
+            amounts[n, column[asset]] += amount
+            prices[n, column[asset]] = price
+            thresholds[n, column[asset]] = threshold
+
+    return {
+        "assets": assets,
+        "amounts": amounts,
+        "prices": prices,
+        "thresholds": thresholds,
+        "borrowed": np.asarray(
+            [as_strategy(s)["position"]["borrowed_amount"] for s in strategies],
+            dtype=float,
+        ),
+    }
+
+
+# =========================================================
+# Row-oriented matrix (report format)
+# =========================================================
+
+@instrumented(scenarios=len)
+def run_scenario_matrix(
+    strategy: dict,
+    price_shocks=PRICE_SHOCKS,
+    borrow_multipliers=BORROW_MULTIPLIERS,
+    volatility_regimes: dict = VOLATILITY_REGIMES,
+):
+    grid = run_scenario_grid(
+        strategy, price_shocks, borrow_multipliers, volatility_regimes
+    )
+    return materialize_scenario_rows(grid)
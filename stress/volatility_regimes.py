@@ -1,4 +1,5 @@
-from defi_risk_agent.simulator import simulate_price_drop
+from defi_risk_agent.instrumentation import instrumented
+from defi_risk_agent.simulator import simulate_price_drop, single_collateral_equivalent
 
 VOLATILITY_REGIMES = {
     "calm": 0.7,
@@ -9,10 +10,9 @@ VOLATILITY_REGIMES = {
 
 BASE_PRICE_DROP = 0.20  # 20%
 
+@instrumented(scenarios=len)
 def run_volatility_regime_stress(strategy: dict):
-    position = strategy["position"]
-    market = strategy["market"]
-    protocol = strategy["protocol"]
+    strategy = single_collateral_equivalent(strategy)
 
     results = []
 
@@ -20,10 +20,10 @@ def run_volatility_regime_stress(strategy: dict):
         effective_drop = min(BASE_PRICE_DROP * multiplier, 0.95)
 
         outcome = simulate_price_drop(
-            collateral_amount=position["collateral_amount"],
-            price=market["collateral_price"],
-            borrowed=position["borrowed_amount"],
-            liquidation_threshold=protocol["liquidation_threshold"],
+            collateral_amount=strategy.collateral_amount,
+            price=strategy.collateral_price,
+            borrowed=strategy.borrowed_amount,
+            liquidation_threshold=strategy.liquidation_threshold,
             drop_pct=effective_drop,
         )
 
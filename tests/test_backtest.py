@@ -0,0 +1,21 @@
+import pytest
+
+from defi_risk_agent.stress.backtest import iter_csv_prices
+
+
+def test_csv_windows_skip_blank_rows(tmp_path):
+    path = tmp_path / "prices.csv"
+    path.write_text("timestamp,price\n\nt0,1\nt1,2\n\n\nt2,3\nt3,4\nt4,5\n\n")
+
+    windows = [prices.tolist() for _, prices in iter_csv_prices(path, window=2)]
+
+    assert windows == [[1, 2], [3, 4], [5]]
+
+
+@pytest.mark.parametrize("text", ["", "\n\n"])
+def test_empty_csv_is_rejected(tmp_path, text):
+    path = tmp_path / "prices.csv"
+    path.write_text(text)
+
+    with pytest.raises(ValueError, match="CSV is empty"):
+        next(iter_csv_prices(path))
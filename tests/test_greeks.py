@@ -0,0 +1,66 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from defi_risk_agent.batch import PositionBatch, simulate_price_drop_batch
+from defi_risk_agent.scoring.greeks import INPUTS, compute_greeks
+from defi_risk_agent.stress.leverage_sensitivity import BORROWED_LEVELS
+from defi_risk_agent.stress.price_shocks import PRICE_SHOCK_DROPS
+
+
+def make_batch(n: int = 400, seed: int = 3) -> PositionBatch:
+    rng = np.random.default_rng(seed)
+    return PositionBatch(
+        collateral_amount=rng.uniform(1, 10, n),
+        borrowed_amount=rng.uniform(1000, 20000, n),
+        price=rng.uniform(1500, 2500, n),
+        liquidation_threshold=rng.uniform(0.7, 0.9, n),
+    )
+
+
+def unrounded_score(batch: PositionBatch, leverage_borrowed) -> np.ndarray:
+    # score_book without the rounding of its inputs and output
+    value = batch.collateral_amount * batch.price
+    T = batch.liquidation_threshold
+
+    margin = np.maximum(100 * (1 - batch.borrowed_amount / (value * T)), 0)
+    liquidated = simulate_price_drop_batch(batch, PRICE_SHOCK_DROPS)["liquidated"]
+    survival = 1 - liquidated.mean(axis=1)
+    penalty = np.abs(100 * (T - np.asarray(leverage_borrowed, dtype=float) / value))
+
+    return np.maximum(
+        100 - np.maximum(0, 30 - margin) - (1 - survival) * 40 - 0.3 * penalty, 0
+    )
+
+
+@pytest.mark.parametrize("leverage_borrowed", [
+    BORROWED_LEVELS[-1],
+    np.linspace(5000, 15000, 400),
+])
+def test_risk_score_greeks_match_finite_differences(leverage_borrowed):
+    batch = make_batch()
+    greeks = compute_greeks(batch, leverage_borrowed)
+
+    for name, column in INPUTS.items():
+        x = getattr(batch, column)
+        h = x * 1e-7
+        up = unrounded_score(replace(batch, **{column: x + h}), leverage_borrowed)
+        down = unrounded_score(replace(batch, **{column: x - h}), leverage_borrowed)
+
+        np.testing.assert_allclose(
+            greeks["risk_score"][name], (up - down) / (2 * h), rtol=1e-4, atol=1e-6
+        )
+
+
+def test_score_greeks_ignore_own_debt_in_leverage_penalty():
+    batch = make_batch()
+    greeks = compute_greeks(batch)
+
+    # Where the margin term is inactive, debt only enters through the
+    # step-wise stress survival, so its derivative is zero
+    value = batch.collateral_amount * batch.price
+    margin = 100 * (1 - batch.borrowed_amount / (value * batch.liquidation_threshold))
+    inactive = (margin >= 30) | (margin <= 0)
+
+    assert np.all(greeks["risk_score"]["debt"][inactive] == 0)
@@ -0,0 +1,39 @@
+import numpy as np
+
+from defi_risk_agent.batch import PositionBatch
+from defi_risk_agent.stress.liquidation_cascade import (
+    linear_price_impact,
+    run_liquidation_cascade,
+)
+
+
+def make_batch(n: int = 200, seed: int = 0) -> PositionBatch:
+    rng = np.random.default_rng(seed)
+    return PositionBatch(
+        collateral_amount=rng.uniform(1, 10, n),
+        borrowed_amount=rng.uniform(1000, 12000, n),
+        price=np.full(n, 2000.0),
+        liquidation_threshold=np.full(n, 0.8),
+    )
+
+
+def test_non_monotone_impact_never_unliquidates():
+    # Impact that reverses once enough collateral has been sold
+    def rebound(collateral_sold):
+        return 0.05 if collateral_sold < 20 else -0.5
+
+    result = run_liquidation_cascade(make_batch(), 0.2, rebound)
+
+    assert all(r["newly_liquidated"] > 0 for r in result["rounds"])
+    assert result["liquidated_positions"] == sum(
+        r["newly_liquidated"] for r in result["rounds"]
+    )
+
+
+def test_empty_book():
+    result = run_liquidation_cascade(
+        make_batch(0), 0.2, linear_price_impact(0.01), price=2000.0
+    )
+
+    assert result["liquidated_positions"] == 0
+    assert result["final_drop_pct"] == 20.0
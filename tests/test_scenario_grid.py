@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from defi_risk_agent.scoring.risk_surface import aggregate_risk_surface_stream
+from defi_risk_agent.simulator import load_strategy
+from defi_risk_agent.stress.scenario_matrix import (
+    PRICE_SHOCKS,
+    iter_scenario_grid,
+    run_scenario_grid,
+)
+
+# 400 x 50 = 20,000 cells per shock row
+BORROW_MULTIPLIERS = np.linspace(0.5, 1.5, 400).tolist()
+VOLATILITY_REGIMES = {f"regime_{i}": 0.5 + i / 25 for i in range(50)}
+
+
+@pytest.mark.parametrize("block_size", [1_000, 30, 7])
+def test_blocks_are_bounded_along_the_borrow_axis(block_size):
+    strategy = load_strategy("strategy.yaml")
+    grid = (PRICE_SHOCKS, BORROW_MULTIPLIERS, VOLATILITY_REGIMES)
+    blocks = list(iter_scenario_grid(strategy, *grid, block_size=block_size))
+
+    assert max(b["ltv"].size for b in blocks) <= max(block_size, len(VOLATILITY_REGIMES))
+
+    full = run_scenario_grid(strategy, *grid)
+    np.testing.assert_array_equal(
+        np.concatenate([b["ltv"].ravel() for b in blocks]), full["ltv"].ravel()
+    )
+
+    threshold = strategy["protocol"]["liquidation_threshold"]
+    assert aggregate_risk_surface_stream(blocks, threshold) == (
+        aggregate_risk_surface_stream([full], threshold)
+    )
@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+import numpy as np
+
+from defi_risk_agent.batch import PositionBatch
+from defi_risk_agent.scoring.risk_score import score_book
+from defi_risk_agent.service import RiskService
+from defi_risk_agent.simulator import load_strategy
+
+
+def make_positions(count: int) -> list:
+    base = load_strategy("strategy.yaml")
+    return [
+        base.override("position", borrowed_amount=5000.0 + 250.0 * i).to_dict()
+        for i in range(count)
+    ]
+
+
+def post_concurrently(path: str, bodies: list):
+    async def run():
+        service = RiskService(workers=1, max_wait=0.05)
+        try:
+            responses = await asyncio.gather(*(
+                service.dispatch("POST", path, json.dumps(body).encode())
+                for body in bodies
+            ))
+            return responses, await service.metrics({})
+        finally:
+            service.close()
+
+    return asyncio.run(run())
+
+
+def test_concurrent_risk_score_requests_are_coalesced():
+    positions = make_positions(8)
+    responses, metrics = post_concurrently(
+        "/risk_score", [{"position": p} for p in positions]
+    )
+
+    assert [status for status, _ in responses] == [200] * len(positions)
+    assert metrics["score_batching"]["requests"] == len(positions)
+    assert metrics["score_batching"]["batches"] == 1
+
+    expected = score_book(PositionBatch.from_strategies(positions))["risk_score"]
+    np.testing.assert_array_equal(
+        [payload["risk_score"] for _, payload in responses], expected
+    )
+
+
+def test_malformed_position_fails_only_its_own_request():
+    positions = make_positions(3)
+    bodies = [{"position": p} for p in positions]
+    bodies.insert(1, {"position": {"position": {}}})
+
+    responses, metrics = post_concurrently("/risk_score", bodies)
+
+    assert [status for status, _ in responses] == [200, 400, 200, 200]
+    assert metrics["score_batching"]["failed_batches"] == 1
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from defi_risk_agent.cli import LIGHT_MODULES, STARTUP_BUDGET_MS, measure_import
+
+# Loaded CI machines can raise the wall-clock budget
+BUDGET_MS = float(os.environ.get("DEFI_RISK_AGENT_STARTUP_BUDGET_MS", STARTUP_BUDGET_MS))
+
+FORBIDDEN = ("numpy", "matplotlib", "concurrent.futures.process")
+
+_CHECK = """
+import sys
+import {module}
+print(",".join(m for m in {forbidden!r} if m in sys.modules))
+"""
+
+
+@pytest.mark.parametrize("module", LIGHT_MODULES)
+def test_light_module_does_not_import_heavy_modules(module):
+    # Checked directly in a fresh interpreter, independently of
+    # cli.HEAVY_MODULES
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(p for p in sys.path if p)}
+    loaded = subprocess.run(
+        [sys.executable, "-c", _CHECK.format(module=module, forbidden=FORBIDDEN)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+    assert loaded == ""
+
+
+@pytest.mark.parametrize("module", LIGHT_MODULES)
+def test_light_module_imports_within_budget(module):
+    result = measure_import(module, repeat=3)
+
+    assert result["heavy_imports"] == []
+    assert result["import_ms"] <= BUDGET_MS
@@ -1,88 +1,115 @@
-import json
-from pathlib import Path
+import argparse
 
-import matplotlib.pyplot as plt
-import pandas as pd
+# matplotlib and pandas are imported inside the functions that use them,
+# so importing this module (e.g. from the CLI) stays cheap.
+
+PLOT_COLUMNS = [
+    "price_shock_pct",
+    "borrow_multiplier",
+    "volatility_regime",
+    "effective_drop_pct",
+    "ltv_pct",
+    "risk_zone",
+]
+
+# Risk zone -> numeric value for the heatmaps
+ZONE_MAP = {"SAFE": 0, "WARNING": 1, "LIQUIDATED": 2}
 
 
 # =========================================================
-# Load data (read-only)
+# Load data (read-only, only the columns plotted)
 # =========================================================
 
-BASE_DIR = Path(__file__).resolve().parents[1]
-REPORT_PATH = BASE_DIR / "reports" / "latest.json"
+def load_frame(report: dict):
+    import pandas as pd
 
-with open(REPORT_PATH, "r") as f:
-    report = json.load(f)
+    from defi_risk_agent.reports.columnar import load_columns
 
-matrix = report["risk_surface"]["enriched_matrix"]
-threshold_pct = report["base"]["liquidation_threshold_pct"]
+    df = pd.DataFrame(load_columns(
+        "risk_surface.enriched_matrix",
+        PLOT_COLUMNS,
+        manifest=report,
+    ))
+    df["zone_num"] = df["risk_zone"].map(ZONE_MAP)
 
-
-df = pd.DataFrame(matrix)
+    return df
 
 
 # =========================================================
-# Helper: map risk zone to numeric for heatmap
+# 1. Heatmaps (one per volatility regime)
 # =========================================================
 
-ZONE_MAP = {"SAFE": 0, "WARNING": 1, "LIQUIDATED": 2}
-df["zone_num"] = df["risk_zone"].map(ZONE_MAP)
+def plot_heatmaps(df):
+    import matplotlib.pyplot as plt
+
+    for regime in df["volatility_regime"].unique():
+        subset = df[df["volatility_regime"] == regime]
+
+        pivot = subset.pivot(
+            index="price_shock_pct",
+            columns="borrow_multiplier",
+            values="zone_num",
+        )
+
+        plt.figure()
+        plt.imshow(pivot, aspect="auto")
+        plt.colorbar(ticks=[0, 1, 2])
+        plt.clim(0, 2)
+
+        plt.xticks(range(len(pivot.columns)), pivot.columns)
+        plt.yticks(range(len(pivot.index)), pivot.index)
+
+        plt.xlabel("Borrow Multiplier")
+        plt.ylabel("Price Shock (%)")
+        plt.title(f"Risk Heatmap — {regime.capitalize()} Regime")
+
+        plt.show()
 
 
 # =========================================================
-# 1. Heatmaps (one per volatility regime)
+# 2. Cliff plot (LTV vs effective drop)
 # =========================================================
 
-for regime in df["volatility_regime"].unique():
-    subset = df[df["volatility_regime"] == regime]
-
-    pivot = subset.pivot(
-        index="price_shock_pct",
-        columns="borrow_multiplier",
-        values="zone_num",
-    )
+def plot_liquidation_cliff(df, threshold_pct: float):
+    import matplotlib.pyplot as plt
 
     plt.figure()
-    plt.imshow(pivot, aspect="auto")
-    plt.colorbar(ticks=[0, 1, 2])
-    plt.clim(0, 2)
 
-    plt.xticks(range(len(pivot.columns)), pivot.columns)
-    plt.yticks(range(len(pivot.index)), pivot.index)
+    for regime in df["volatility_regime"].unique():
+        subset = df[df["volatility_regime"] == regime]
+        plt.plot(
+            subset["effective_drop_pct"],
+            subset["ltv_pct"],
+            marker="o",
+            linestyle="",
+            label=regime,
+        )
+
+    plt.axhline(
+        y=threshold_pct,
+        linestyle="--",
+        label="Liquidation Threshold",
+    )
 
-    plt.xlabel("Borrow Multiplier")
-    plt.ylabel("Price Shock (%)")
-    plt.title(f"Risk Heatmap — {regime.capitalize()} Regime")
+    plt.xlabel("Effective Price Drop (%)")
+    plt.ylabel("LTV (%)")
+    plt.title("Liquidation Cliff")
+    plt.legend()
 
     plt.show()
 
 
-# =========================================================
-# 2. Cliff plot (LTV vs effective drop)
-# =========================================================
+def main(argv=None):
+    from defi_risk_agent.reports.columnar import load_manifest
 
-plt.figure()
+    argparse.ArgumentParser(description="Plot the latest risk surface").parse_args(argv)
 
-for regime in df["volatility_regime"].unique():
-    subset = df[df["volatility_regime"] == regime]
-    plt.plot(
-        subset["effective_drop_pct"],
-        subset["ltv_pct"],
-        marker="o",
-        linestyle="",
-        label=regime,
-    )
+    report = load_manifest()
+    df = load_frame(report)
 
-plt.axhline(
-    y=threshold_pct,
-    linestyle="--",
-    label="Liquidation Threshold",
-)
+    plot_heatmaps(df)
+    plot_liquidation_cliff(df, report["base"]["liquidation_threshold_pct"])
 
-plt.xlabel("Effective Price Drop (%)")
-plt.ylabel("LTV (%)")
-plt.title("Liquidation Cliff")
-plt.legend()
 
-plt.show()
+if __name__ == "__main__":
+    main()